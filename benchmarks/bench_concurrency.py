@@ -0,0 +1,72 @@
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from booklender.threadsafe import ConcurrentBookLender
+
+
+def worker(library, seed, operations, books, patrons, borrowed):
+    rng = random.Random(seed)
+    count = 0
+    for _ in range(operations):
+        book_id = rng.randrange(books)
+        patron_id = rng.randrange(patrons)
+        choice = rng.random()
+        if choice < 0.4:
+            if library.borrow_book(book_id, patron_id).startswith('Patron'):
+                count += 1
+        elif choice < 0.8:
+            library.return_book(book_id, patron_id)
+        elif choice < 0.95:
+            library.check_book(book_id)
+        else:
+            library.list_patrons_books(patron_id)
+    borrowed.append(count)
+
+
+def check_accounting(library, successful_borrows):
+    lender = library.library
+    loans = [book_id for patron in lender.iter_patrons() for book_id in patron.borrowed_books]
+    unavailable = [node.book_id for node in lender.iter_books() if not node.available]
+    assert len(loans) == len(set(loans)), 'a book is on loan to two patrons'
+    assert sorted(loans) == unavailable, 'loans and availability disagree'
+    assert sum(node.times_borrowed for node in lender.iter_books()) == successful_borrows
+    assert lender.available_count() == sum(1 for node in lender.iter_books() if node.available)
+
+
+def run(threads, operations, books, patrons):
+    library = ConcurrentBookLender()
+    library.bulk_load_books((book_id, f'Title {book_id}', f'Author {book_id % 97}', str(book_id))
+                            for book_id in range(books))
+    borrowed = []
+    pool = [threading.Thread(target=worker, args=(library, seed, operations, books, patrons, borrowed))
+            for seed in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    check_accounting(library, sum(borrowed))
+    return threads * operations / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stress ConcurrentBookLender and check loan accounting.')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4, 8])
+    parser.add_argument('--operations', type=int, default=50000, help='operations per thread')
+    parser.add_argument('--books', type=int, default=2000)
+    parser.add_argument('--patrons', type=int, default=200)
+    args = parser.parse_args()
+    for threads in args.threads:
+        rate = run(threads, args.operations, args.books, args.patrons)
+        print(f'threads={threads:3d}  {rate:12.0f} ops/sec  accounting ok')
+
+
+if __name__ == '__main__':
+    main()
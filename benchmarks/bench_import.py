@@ -0,0 +1,89 @@
+import argparse
+import os
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE = os.path.join(ROOT, 'inputPS04.txt')
+
+
+def timed(command, runs, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, env=env, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def report(label, samples, baseline=None):
+    median = statistics.median(samples) * 1000
+    extra = f'  (+{median - baseline:.1f} ms over bare interpreter)' if baseline is not None else ''
+    print(f'{label:<28} median {median:7.1f} ms  min {min(samples) * 1000:7.1f} ms{extra}')
+    return median
+
+
+def import_profile(module, top, cwd):
+    # -X importtime writes one line per module to stderr; the cumulative
+    # column (second) shows which imports dominate.
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=cwd, env=env, check=True, capture_output=True, text=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        rows.append((int(cumulative_us), int(self_us), name.rstrip()))
+    print(f'\nslowest imports under "import {module}" (cumulative / self, us):')
+    for cumulative, own, name in sorted(rows, reverse=True)[:top]:
+        print(f'  {cumulative:8d} {own:8d} {name}')
+
+
+def wait_for_port(port, retries=100):
+    for _ in range(retries):
+        try:
+            socket.create_connection(('127.0.0.1', port)).close()
+            return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError('daemon did not start')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure command-line startup: import cost and end-to-end runs.')
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--port', type=int, default=8798)
+    parser.add_argument('--top', type=int, default=10, help='rows of the -X importtime profile to show')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp()
+    try:
+        shutil.copy(SAMPLE, os.path.join(workdir, 'inputPS04.txt'))
+        python = sys.executable
+        baseline = report('python -c pass', timed([python, '-c', 'pass'], args.runs, workdir))
+        report('import booklender.core', timed([python, '-c', 'import booklender.core'], args.runs, workdir), baseline)
+        report('python -m booklender', timed([python, '-m', 'booklender'], args.runs, workdir), baseline)
+
+        daemon = subprocess.Popen([python, '-m', 'booklender', 'serve', '--port', str(args.port)], cwd=ROOT)
+        try:
+            wait_for_port(args.port)
+            report('booklender --connect', timed([python, '-m', 'booklender', '--connect', str(args.port)],
+                                                 args.runs, workdir), baseline)
+        finally:
+            daemon.terminate()
+            daemon.wait()
+
+        import_profile('booklender.cli', args.top, workdir)
+    finally:
+        shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
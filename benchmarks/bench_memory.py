@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import booklender.core
+from booklender.core import BookLender, BookNode
+
+
+class DictBookNode:
+    # BookNode without __slots__: same fields and update(), but every
+    # instance carries a __dict__.
+    def __init__(self, book_id, title, author, isbn):
+        self.book_id = book_id
+        self.title = title
+        self.author = sys.intern(author)
+        self.isbn = isbn
+        self.available = True
+        self.times_borrowed = 0
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.size = 1
+        self.available_count = 1
+
+    update = BookNode.update
+
+
+def make_records(count, authors):
+    return [(book_id, f'Title {book_id}', f'Author {book_id % authors}', f'{9780000000000 + book_id}')
+            for book_id in range(count)]
+
+
+def measure(build, records):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    keep = build(records)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return (after - before) / len(records)
+
+
+def build_lender(node_class):
+    # The same BookLender (tree and indexes) either way; only the class
+    # add_book instantiates for each book differs.
+    def build(records):
+        saved = booklender.core.BookNode
+        booklender.core.BookNode = node_class
+        try:
+            library = BookLender()
+            for record in records:
+                library.add_book(*record)
+        finally:
+            booklender.core.BookNode = saved
+        return library
+    return build
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report bytes per book for BookLender node storage.')
+    parser.add_argument('--books', type=int, default=200000)
+    parser.add_argument('--authors', type=int, default=1000)
+    args = parser.parse_args()
+
+    records = make_records(args.books, args.authors)
+    dict_bytes = measure(build_lender(DictBookNode), records)
+    records = make_records(args.books, args.authors)
+    slots_bytes = measure(build_lender(BookNode), records)
+    print(f'books: {args.books}')
+    print(f'BookLender, dict nodes:  {dict_bytes:8.1f} bytes/book')
+    print(f'BookLender, slot nodes:  {slots_bytes:8.1f} bytes/book')
+    print(f'saved by __slots__:      {dict_bytes - slots_bytes:8.1f} bytes/book')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+from bisect import bisect_left
+from itertools import accumulate
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from booklender.core import BookLender
+
+DISTRIBUTIONS = ('sequential', 'random', 'zipf')
+
+
+class Zipf:
+    def __init__(self, count, skew, rng):
+        self.rng = rng
+        self.cumulative = list(accumulate(1.0 / (rank ** skew) for rank in range(1, count + 1)))
+
+    def sample(self):
+        return bisect_left(self.cumulative, self.rng.random() * self.cumulative[-1])
+
+
+def make_catalog(size, distribution, authors, author_skew, rng):
+    # sequential inserts in ascending book_id order; random and zipf insert in
+    # shuffled order (zipf differs in which books the later operations hit).
+    book_ids = list(range(size))
+    if distribution != 'sequential':
+        rng.shuffle(book_ids)
+    author_of = Zipf(authors, author_skew, rng)
+    return [(book_id, f'Title {book_id}', f'Author {author_of.sample()}', f'{9780000000000 + book_id}')
+            for book_id in book_ids]
+
+
+def make_targets(size, count, distribution, rng):
+    if distribution == 'sequential':
+        return [i % size for i in range(count)]
+    if distribution == 'random':
+        return [rng.randrange(size) for _ in range(count)]
+    popular = Zipf(size, 1.1, rng)
+    permutation = list(range(size))
+    rng.shuffle(permutation)
+    return [permutation[popular.sample()] for _ in range(count)]
+
+
+def summarize(latencies):
+    latencies.sort()
+    total = sum(latencies)
+
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1e6
+
+    return {
+        'calls': len(latencies),
+        'ops_per_sec': len(latencies) / total if total else None,
+        'p50_us': percentile(0.50),
+        'p90_us': percentile(0.90),
+        'p99_us': percentile(0.99),
+        'max_us': latencies[-1] * 1e6,
+    }
+
+
+def timed(calls):
+    clock = time.perf_counter
+    latencies = []
+    for function, args in calls:
+        start = clock()
+        function(*args)
+        latencies.append(clock() - start)
+    return summarize(latencies)
+
+
+def run_case(size, distribution, operations, listings, authors, author_skew, seed):
+    rng = random.Random(seed)
+    catalog = make_catalog(size, distribution, authors, author_skew, rng)
+    targets = make_targets(size, operations, distribution, rng)
+    patrons = max(1, size // 10)
+    patron_of = [rng.randrange(patrons) for _ in targets]
+    library = BookLender()
+    results = {}
+
+    results['add_book'] = timed((library.add_book, record) for record in catalog)
+    results['borrow_book'] = timed((library.borrow_book, (book_id, patron_id))
+                                   for book_id, patron_id in zip(targets, patron_of))
+    results['check_book'] = timed((library.check_book, (book_id,)) for book_id in targets)
+    results['list_patrons_books'] = timed((library.list_patrons_books, (patron_id,)) for patron_id in patron_of)
+    author_pick = Zipf(authors, author_skew, rng)
+    results['list_books_by_author'] = timed((library.list_books_by_author, (f'Author {author_pick.sample()}',))
+                                            for _ in range(listings))
+    results['list_available_books'] = timed((library.list_available_books, ()) for _ in range(listings))
+    results['return_book'] = timed((library.return_book, (book_id, patron_id))
+                                   for book_id, patron_id in zip(targets, patron_of))
+    return {
+        'size': size,
+        'distribution': distribution,
+        'operations': results,
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Time every BookLender operation and print JSON.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--distributions', nargs='+', choices=DISTRIBUTIONS, default=list(DISTRIBUTIONS))
+    parser.add_argument('--operations', type=int, default=100000, help='point operations per case')
+    parser.add_argument('--listings', type=int, default=20, help='listing calls per case')
+    parser.add_argument('--authors', type=int, default=1000)
+    parser.add_argument('--author-skew', type=float, default=1.2)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write JSON here instead of stdout')
+    parser.add_argument('--in-process', action='store_true',
+                        help='run cases in this process (peak RSS then accumulates across cases)')
+    parser.add_argument('--case', nargs=2, metavar=('SIZE', 'DISTRIBUTION'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    options = (args.operations, args.listings, args.authors, args.author_skew, args.seed)
+    if args.case:
+        json.dump(run_case(int(args.case[0]), args.case[1], *options), sys.stdout)
+        return
+
+    cases = []
+    for size in args.sizes:
+        for distribution in args.distributions:
+            if args.in_process:
+                cases.append(run_case(size, distribution, *options))
+                continue
+            # A fresh interpreter per case keeps peak RSS attributable.
+            command = [sys.executable, os.path.abspath(__file__), '--case', str(size), distribution,
+                       '--operations', str(args.operations), '--listings', str(args.listings),
+                       '--authors', str(args.authors), '--author-skew', str(args.author_skew),
+                       '--seed', str(args.seed)]
+            cases.append(json.loads(subprocess.run(command, check=True, capture_output=True).stdout))
+            print(f'{size} {distribution} done', file=sys.stderr)
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'cases': cases}
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(report, output, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
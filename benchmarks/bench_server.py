@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from booklender.server import LibraryClient
+
+
+async def connect(port, retries=50):
+    for _ in range(retries):
+        try:
+            return await LibraryClient.connect(port=port)
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError('server did not start')
+
+
+async def client_loop(client, requests, books, latencies):
+    for i in range(requests):
+        start = time.perf_counter()
+        await client.request(f'checkBook: {i % books}')
+        latencies.append(time.perf_counter() - start)
+
+
+async def run(port, connections, requests, books):
+    loader = await connect(port)
+    await loader.pipeline([f'addBook: {book_id}, "Title {book_id}", "Author", "{book_id}"'
+                           for book_id in range(books)])
+    clients = [await LibraryClient.connect(port=port) for _ in range(connections)]
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop(client, requests, books, latencies) for client in clients))
+    elapsed = time.perf_counter() - start
+    for client in clients + [loader]:
+        await client.close()
+    latencies.sort()
+    print(f'connections={connections} requests={len(latencies)} rate={len(latencies) / elapsed:.0f}/s '
+          f'p50={latencies[len(latencies) // 2] * 1e3:.3f}ms p99={latencies[int(len(latencies) * 0.99)] * 1e3:.3f}ms')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure checkBook latency against booklender serve.')
+    parser.add_argument('--port', type=int, default=8799)
+    parser.add_argument('--connections', type=int, nargs='+', default=[1, 100, 1000])
+    parser.add_argument('--requests', type=int, default=200, help='requests per connection')
+    parser.add_argument('--books', type=int, default=10000)
+    args = parser.parse_args()
+    server = subprocess.Popen([sys.executable, '-m', 'booklender', 'serve', '--port', str(args.port)], cwd=ROOT)
+    try:
+        for connections in args.connections:
+            asyncio.run(run(args.port, connections, args.requests, args.books))
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == '__main__':
+    main()
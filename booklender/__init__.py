@@ -0,0 +1,29 @@
+# Every name loads on first use, so importing a submodule (booklender.cli
+# for the thin client, say) does not drag in the rest: the server pulls in
+# asyncio, the snapshot and log modules mmap/struct/json, and the thin
+# client never needs the tree at all.
+_LAZY = {
+    'BookLender': 'core',
+    'execute_command': 'core',
+    'process_commands': 'core',
+    'ConcurrentBookLender': 'threadsafe',
+    'LibraryClient': 'server',
+    'LibraryServer': 'server',
+    'LibraryStats': 'stats',
+    'OperationLog': 'wal',
+    'ShardedBookLender': 'shards',
+    'recover': 'wal',
+    'run_remote': 'client',
+}
+
+__all__ = list(_LAZY)
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    from importlib import import_module
+    value = getattr(import_module(f'.{module}', __name__), name)
+    globals()[name] = value
+    return value
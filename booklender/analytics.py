@@ -0,0 +1,119 @@
+from array import array
+
+from .core import _author_key
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError('booklender.analytics needs NumPy; install it with "pip install numpy"')
+
+
+def _column(buffer, dtype):
+    # Zero-copy view over an array/bytearray buffer.
+    if not len(buffer):
+        return np.empty(0, dtype=dtype)
+    return np.frombuffer(buffer, dtype=dtype)
+
+
+def export_columns(library):
+    # One in-order pass over each tree into typed buffers, then NumPy views
+    # over them.  Authors are coded by normalized name, the
+    # same grouping list_books_by_author uses; 'authors' maps codes back.
+    _require_numpy()
+    book_ids = array('q')
+    available = bytearray()
+    times_borrowed = array('q')
+    author_codes = array('i')
+    codes_by_author = {}
+    codes_by_key = {}
+    for node in library.iter_books():
+        code = codes_by_author.get(node.author)
+        if code is None:
+            key = _author_key(node.author)
+            code = codes_by_key.setdefault(key, len(codes_by_key))
+            codes_by_author[node.author] = code
+        book_ids.append(node.book_id)
+        available.append(node.available)
+        times_borrowed.append(node.times_borrowed)
+        author_codes.append(code)
+    patron_ids = array('q')
+    patron_loans = array('q')
+    for patron in library.iter_patrons():
+        patron_ids.append(patron.patron_id)
+        patron_loans.append(len(patron.borrowed_books))
+    return {
+        'book_id': _column(book_ids, np.int64),
+        'available': _column(available, np.bool_),
+        'times_borrowed': _column(times_borrowed, np.int64),
+        'author_code': _column(author_codes, np.intc),
+        'authors': np.array(list(codes_by_key), dtype=object),
+        'patron_id': _column(patron_ids, np.int64),
+        'patron_loans': _column(patron_loans, np.int64),
+    }
+
+
+def save_columns(columns, path):
+    _require_numpy()
+    authors = columns['authors'].astype(str)
+    np.savez(path, **dict(columns, authors=authors))
+
+
+def load_columns(path):
+    _require_numpy()
+    with np.load(path) as data:
+        columns = {name: data[name] for name in data.files}
+    columns['authors'] = columns['authors'].astype(object)
+    return columns
+
+
+def availability_ratio(columns):
+    available = columns['available']
+    return float(available.mean()) if available.size else 0.0
+
+
+def books_per_author(columns):
+    return np.bincount(columns['author_code'], minlength=len(columns['authors']))
+
+
+def borrows_per_author(columns):
+    return np.bincount(columns['author_code'], weights=columns['times_borrowed'],
+                       minlength=len(columns['authors'])).astype(np.int64)
+
+
+def available_per_author(columns):
+    return np.bincount(columns['author_code'], weights=columns['available'],
+                       minlength=len(columns['authors'])).astype(np.int64)
+
+
+def top_authors(columns, n=10, by='borrows'):
+    # [(author, total), ...] for the n largest per-author totals.
+    totals = borrows_per_author(columns) if by == 'borrows' else books_per_author(columns)
+    n = min(n, totals.size)
+    if not n:
+        return []
+    top = np.argpartition(totals, -n)[-n:]
+    top = top[np.argsort(-totals[top], kind='stable')]
+    return [(columns['authors'][code], int(totals[code])) for code in top]
+
+
+def borrow_histogram(columns, bins=10):
+    return np.histogram(columns['times_borrowed'], bins=bins)
+
+
+def borrow_percentiles(columns, percentiles=(50, 90, 99)):
+    times_borrowed = columns['times_borrowed']
+    if not times_borrowed.size:
+        return {p: 0.0 for p in percentiles}
+    return dict(zip(percentiles, np.percentile(times_borrowed, percentiles).tolist()))
+
+
+def loan_percentiles(columns, percentiles=(50, 90, 99)):
+    loans = columns['patron_loans']
+    if not loans.size:
+        return {p: 0.0 for p in percentiles}
+    return dict(zip(percentiles, np.percentile(loans, percentiles).tolist()))
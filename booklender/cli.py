@@ -0,0 +1,89 @@
+import sys
+
+USAGE = '''usage: booklender [INPUT [OUTPUT]]
+       booklender --connect [HOST:]PORT [INPUT [OUTPUT]]
+       booklender serve [--host HOST] [--port PORT] [--snapshot PATH]
+
+Runs the commands in INPUT (default inputPS04.txt) and writes the results
+to OUTPUT (default outputPS04.txt); "-" means stdin/stdout.  With --connect
+the commands are sent to a running "booklender serve" daemon instead, which
+keeps its library warm in memory between runs.
+'''
+
+# Batch runs parse argv by hand: argparse imports re, which would cost more
+# than the rest of the startup path put together.  Only the long-running
+# "serve" subcommand uses argparse.
+
+
+def _open(path, mode, default):
+    if path == '-':
+        return default
+    return open(path, mode)
+
+
+def _address(value):
+    # [HOST:]PORT, or None if value is not one.
+    host, _, port = value.rpartition(':')
+    if not port.isdigit() or not 0 < int(port) < 65536:
+        return None
+    return host or '127.0.0.1', int(port)
+
+
+def serve(argv):
+    import argparse
+    import asyncio
+    from .core import BookLender
+    from .server import LibraryServer
+
+    parser = argparse.ArgumentParser(prog='booklender serve',
+                                     description='Serve the BookLender command protocol over TCP.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--snapshot', help='load library state from this snapshot first')
+    args = parser.parse_args(argv)
+    library = BookLender.load_snapshot(args.snapshot) if args.snapshot else BookLender()
+    asyncio.run(LibraryServer(library, args.host, args.port).serve_forever())
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv and argv[0] == 'serve':
+        return serve(argv[1:])
+    if argv and argv[0] in ('-h', '--help'):
+        sys.stdout.write(USAGE)
+        return 0
+    address = None
+    if argv and argv[0] == '--connect':
+        address = _address(argv[1]) if len(argv) > 1 else None
+        if address is None:
+            sys.stderr.write(USAGE)
+            return 2
+        argv = argv[2:]
+    if len(argv) > 2:
+        sys.stderr.write(USAGE)
+        return 2
+    input_file = argv[0] if len(argv) > 0 else 'inputPS04.txt'
+    output_file = argv[1] if len(argv) > 1 else 'outputPS04.txt'
+
+    infile = _open(input_file, 'r', sys.stdin)
+    try:
+        outfile = _open(output_file, 'w', sys.stdout)
+        try:
+            if address is None:
+                from .core import process_commands
+                process_commands(infile, outfile)
+            else:
+                from .client import run_remote
+                try:
+                    run_remote(infile, outfile, *address)
+                except OSError as exc:
+                    sys.stderr.write(f'booklender: {exc}\n')
+                    return 1
+        finally:
+            if outfile is not sys.stdout:
+                outfile.close()
+    finally:
+        if infile is not sys.stdin:
+            infile.close()
+    return 0
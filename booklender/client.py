@@ -0,0 +1,64 @@
+import socket
+import threading
+
+from .protocol import KEYWORDS, TERMINATOR
+
+# Blocking counterpart of server.LibraryClient for one-shot command-line
+# runs: it only needs socket and threading, so it starts without paying
+# for asyncio or loading the library.
+
+
+def _send_lines(sock, in_stream, batch_size, outcome):
+    # outcome collects the number of commands sent and any send error, for
+    # run_remote to check against the responses it read.
+    batch = []
+    sent = 0
+    try:
+        for line in in_stream:
+            line = line.strip()
+            # Lines process_commands would skip are not sent, so the output
+            # matches a local run line for line.
+            if line.partition(':')[0] in KEYWORDS:
+                batch.append(line + '\n')
+            if len(batch) >= batch_size:
+                sock.sendall(''.join(batch).encode('utf-8'))
+                sent += len(batch)
+                batch.clear()
+        if batch:
+            sock.sendall(''.join(batch).encode('utf-8'))
+            sent += len(batch)
+        sock.shutdown(socket.SHUT_WR)
+    except OSError as exc:
+        outcome['error'] = exc
+    outcome['sent'] = sent
+
+
+def run_remote(in_stream, out_stream, host='127.0.0.1', port=8765, batch_size=1024):
+    # Commands are sent from a second thread while responses are read here;
+    # the server stops reading from a client that is not draining its
+    # responses, so sending everything first could deadlock on large input.
+    with socket.create_connection((host, port)) as sock:
+        outcome = {}
+        sender = threading.Thread(target=_send_lines, args=(sock, in_stream, batch_size, outcome), daemon=True)
+        sender.start()
+        responses = 0
+        lines = []
+        with sock.makefile('r', encoding='utf-8', newline='\n') as reader:
+            for line in reader:
+                line = line.rstrip('\n')
+                if line == TERMINATOR:
+                    lines.append('')
+                    out_stream.write('\n'.join(lines))
+                    lines.clear()
+                    responses += 1
+                    continue
+                if line.startswith('.'):
+                    line = line[1:]
+                lines.append(line)
+        sender.join()
+        if 'error' in outcome:
+            raise ConnectionError(f'sending commands failed: {outcome["error"]}')
+        if lines or responses != outcome['sent']:
+            raise ConnectionError(f'server closed the connection after {responses} of '
+                                  f'{outcome["sent"]} responses')
+        return responses
@@ -0,0 +1,1214 @@
+import sys
+from array import array
+from collections import OrderedDict
+from contextlib import nullcontext
+from bisect import bisect_left, bisect_right, insort
+from itertools import chain, islice
+from operator import itemgetter
+
+
+def _height(node):
+    return node.height if node is not None else 0
+
+
+def _rotate_left(node):
+    pivot = node.right
+    node.right = pivot.left
+    pivot.left = node
+    node.update()
+    pivot.update()
+    return pivot
+
+
+def _rotate_right(node):
+    pivot = node.left
+    node.left = pivot.right
+    pivot.right = node
+    node.update()
+    pivot.update()
+    return pivot
+
+
+def _rebalance(node):
+    node.update()
+    balance = _height(node.left) - _height(node.right)
+    if balance > 1:
+        if _height(node.left.left) < _height(node.left.right):
+            node.left = _rotate_left(node.left)
+        return _rotate_right(node)
+    if balance < -1:
+        if _height(node.right.right) < _height(node.right.left):
+            node.right = _rotate_right(node.right)
+        return _rotate_left(node)
+    return node
+
+
+def _attach(path, node):
+    # path holds (parent, went_right) pairs from the root down to the new
+    # node's parent; rebalance bottom-up and return the (possibly new) root.
+    child = node
+    for parent, went_right in reversed(path):
+        if went_right:
+            parent.right = child
+        else:
+            parent.left = child
+        height = parent.height
+        child = _rebalance(parent)
+        if child is parent and child.height == height:
+            return path[0][0]
+    return child
+
+
+def _build_balanced(nodes):
+    # nodes must be sorted by key; middle elements become subtree roots, so
+    # sibling subtrees differ in size by at most one and the AVL invariant holds.
+    if not nodes:
+        return None
+    root = None
+    order = []
+    stack = [(0, len(nodes) - 1, None, False)]
+    while stack:
+        lo, hi, parent, is_right = stack.pop()
+        mid = (lo + hi) // 2
+        node = nodes[mid]
+        node.left = node.right = None
+        if parent is None:
+            root = node
+        elif is_right:
+            parent.right = node
+        else:
+            parent.left = node
+        order.append(node)
+        if lo < mid:
+            stack.append((lo, mid - 1, node, False))
+        if mid < hi:
+            stack.append((mid + 1, hi, node, True))
+    for node in reversed(order):
+        node.update()
+    return root
+
+
+def _sorted_by_key(records):
+    records = list(records)
+    if any(records[i][0] > records[i + 1][0] for i in range(len(records) - 1)):
+        records.sort(key=itemgetter(0))
+    return records
+
+
+def _author_key(author):
+    return author.strip().lower()
+
+
+def _title_key(title):
+    return title.strip().lower()
+
+
+# string.punctuation, spelled out so that importing this module does not pull in re.
+_PUNCTUATION = str.maketrans('!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~', ' ' * 32)
+
+
+def _title_tokens(key):
+    return set(key.translate(_PUNCTUATION).split())
+
+
+def _book_line(node):
+    return f'- Book ID {node.book_id}: "{node.title}" by {node.author}'
+
+
+def _popular_line(node):
+    return f'- Book ID {node.book_id}: "{node.title}" by {node.author} (Borrowed {node.times_borrowed} times)'
+
+
+def _write_lines(lines, sink, chunk_size):
+    # Writes each line followed by a newline, chunk_size lines per write.
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= chunk_size:
+            chunk.append("")
+            sink.write("\n".join(chunk))
+            chunk.clear()
+    if chunk:
+        chunk.append("")
+        sink.write("\n".join(chunk))
+
+
+def _loan_line(node):
+    return f'- "{node.title}" (Book ID: {node.book_id})'
+
+
+class BookNode:
+    __slots__ = ('book_id', 'title', 'author', 'isbn', 'available', 'times_borrowed',
+                 'left', 'right', 'height', 'size', 'available_count')
+
+    def __init__(self, book_id, title, author, isbn):
+        self.book_id = book_id
+        self.title = title
+        self.author = sys.intern(author)
+        self.isbn = isbn
+        self.available = True
+        self.times_borrowed = 0
+        self.left = None
+        self.right = None
+        self.height = 1
+        self.size = 1
+        self.available_count = 1
+
+    def update(self):
+        left, right = self.left, self.right
+        height = 0
+        size = 1
+        available_count = self.available
+        if left is not None:
+            height = left.height
+            size += left.size
+            available_count += left.available_count
+        if right is not None:
+            height = max(height, right.height)
+            size += right.size
+            available_count += right.available_count
+        self.height = height + 1
+        self.size = size
+        self.available_count = available_count
+ 
+class PatronNode:
+    __slots__ = ('patron_id', 'name', 'borrowed_books', 'left', 'right', 'height')
+
+    def __init__(self, patron_id, name):
+        self.patron_id = patron_id
+        self.name = name
+        # book_id -> BookNode, in borrowing order
+        self.borrowed_books = {}
+        self.left = None
+        self.right = None
+        self.height = 1
+
+    def update(self):
+        self.height = 1 + max(_height(self.left), _height(self.right))
+ 
+class ResultCache:
+    # LRU cache of formatted read results.  Each entry carries one tag (the
+    # book, author or availability set it depends on); invalidating a tag
+    # drops every entry that carries it.  The generation counter stops a
+    # reader that raced with a mutation from storing its stale result.
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._tagged = {}
+        self._generation = 0
+        # Replaced with a real lock by booklender.threadsafe.ConcurrentBookLender.
+        self._lock = nullcontext()
+
+    def fetch(self, key, tag, compute, *args):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+        result = compute(*args)
+        self.store(key, tag, result, generation)
+        return result
+
+    @property
+    def generation(self):
+        return self._generation
+
+    def store(self, key, tag, result, generation):
+        # Caches result unless something was invalidated since generation
+        # was read, i.e. while result was being computed.
+        with self._lock:
+            if generation == self._generation and key not in self._entries:
+                self._entries[key] = (result, tag)
+                self._tagged.setdefault(tag, set()).add(key)
+                if len(self._entries) > self.max_size:
+                    old_key, (_, old_tag) = self._entries.popitem(last=False)
+                    self._untag(old_key, old_tag)
+
+    def lookup(self, key):
+        # Cached result for key or None, without computing it on a miss.
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def _untag(self, key, tag):
+        keys = self._tagged[tag]
+        keys.discard(key)
+        if not keys:
+            del self._tagged[tag]
+
+    def invalidate(self, *tags):
+        with self._lock:
+            self._generation += 1
+            for tag in tags:
+                for key in self._tagged.pop(tag, ()):
+                    del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._tagged.clear()
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._entries), 'max_size': self.max_size}
+
+
+# The title indexes and popularity buckets keep their entries sorted in
+# blocks of at most 2 * _BLOCK_LOAD, with the largest entry of each block in
+# _maxes: an insert or delete bisects _maxes and shifts one block, instead
+# of shifting an array that grows with the whole catalog.
+_BLOCK_LOAD = 1024
+
+
+class SortedIds:
+    __slots__ = ('_blocks', '_maxes', '_len')
+
+    def __init__(self, book_ids=()):
+        # book_ids, if given, must already be sorted.
+        self._blocks = [array('q', book_ids[start:start + _BLOCK_LOAD])
+                        for start in range(0, len(book_ids), _BLOCK_LOAD)]
+        self._maxes = [block[-1] for block in self._blocks]
+        self._len = len(book_ids)
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for block in self._blocks:
+            yield from block
+
+    def add(self, book_id):
+        maxes = self._maxes
+        if not maxes:
+            self._blocks.append(array('q', [book_id]))
+            maxes.append(book_id)
+        else:
+            i = bisect_left(maxes, book_id)
+            if i == len(maxes):
+                i -= 1
+                self._blocks[i].append(book_id)
+                maxes[i] = book_id
+            else:
+                block = self._blocks[i]
+                block.insert(bisect_left(block, book_id), book_id)
+            block = self._blocks[i]
+            if len(block) > 2 * _BLOCK_LOAD:
+                self._blocks.insert(i + 1, block[_BLOCK_LOAD:])
+                del block[_BLOCK_LOAD:]
+                maxes.insert(i, block[-1])
+        self._len += 1
+
+    def remove(self, book_id):
+        i = bisect_left(self._maxes, book_id)
+        block = self._blocks[i]
+        del block[bisect_left(block, book_id)]
+        if block:
+            self._maxes[i] = block[-1]
+        else:
+            del self._blocks[i]
+            del self._maxes[i]
+        self._len -= 1
+
+
+class TitleIndex:
+    # Normalized titles in (key, book_id) order, with each block's keys in a
+    # list and the matching book_ids in a parallel array.
+    __slots__ = ('_keys', '_ids', '_maxes')
+
+    def __init__(self):
+        self._keys = []
+        self._ids = []
+        self._maxes = []
+
+    def __len__(self):
+        return sum(len(keys) for keys in self._keys)
+
+    def __iter__(self):
+        for keys, ids in zip(self._keys, self._ids):
+            yield from zip(keys, ids)
+
+    def _locate(self, key, book_id):
+        i = bisect_left(self._maxes, (key, book_id))
+        if i == len(self._maxes):
+            i -= 1
+        keys = self._keys[i]
+        lo = bisect_left(keys, key)
+        hi = bisect_right(keys, key, lo)
+        return i, bisect_left(self._ids[i], book_id, lo, hi)
+
+    def add(self, key, book_id):
+        if not self._maxes:
+            self._keys.append([key])
+            self._ids.append(array('q', [book_id]))
+            self._maxes.append((key, book_id))
+            return
+        i, position = self._locate(key, book_id)
+        keys = self._keys[i]
+        ids = self._ids[i]
+        keys.insert(position, key)
+        ids.insert(position, book_id)
+        if position == len(keys) - 1:
+            self._maxes[i] = (key, book_id)
+        if len(keys) > 2 * _BLOCK_LOAD:
+            self._keys.insert(i + 1, keys[_BLOCK_LOAD:])
+            self._ids.insert(i + 1, ids[_BLOCK_LOAD:])
+            del keys[_BLOCK_LOAD:]
+            del ids[_BLOCK_LOAD:]
+            self._maxes.insert(i, (keys[-1], ids[-1]))
+
+    def remove(self, key, book_id):
+        i, position = self._locate(key, book_id)
+        keys = self._keys[i]
+        ids = self._ids[i]
+        del keys[position]
+        del ids[position]
+        if keys:
+            self._maxes[i] = (keys[-1], ids[-1])
+        else:
+            del self._keys[i]
+            del self._ids[i]
+            del self._maxes[i]
+
+    def extend(self, entries):
+        # Bulk add: merges once and re-blocks instead of adding one by one.
+        entries = sorted([*self, *entries])
+        self._keys = []
+        self._ids = []
+        self._maxes = []
+        for start in range(0, len(entries), _BLOCK_LOAD):
+            block = entries[start:start + _BLOCK_LOAD]
+            self._keys.append([key for key, _ in block])
+            self._ids.append(array('q', [book_id for _, book_id in block]))
+            self._maxes.append(block[-1])
+
+    def iter_prefix(self, prefix):
+        # book_ids whose key starts with prefix, in (key, book_id) order.
+        i = bisect_left(self._maxes, (prefix,))
+        position = bisect_left(self._keys[i], prefix) if i < len(self._keys) else 0
+        while i < len(self._keys):
+            keys = self._keys[i]
+            ids = self._ids[i]
+            while position < len(keys):
+                if not keys[position].startswith(prefix):
+                    return
+                yield ids[position]
+                position += 1
+            i += 1
+            position = 0
+
+
+# Keyword postings stay compact while small, since most title tokens
+# (numbers, volume markers, rare words) belong to one or a few books: a
+# bare book_id for one book, a sorted array('q') for up to 2 * _BLOCK_LOAD,
+# and SortedIds beyond that.
+def _posting_added(postings, book_id):
+    if postings is None:
+        return book_id
+    if type(postings) is int:
+        return array('q', (postings, book_id) if postings < book_id else (book_id, postings))
+    if type(postings) is array:
+        if postings[-1] < book_id:
+            postings.append(book_id)
+        else:
+            postings.insert(bisect_left(postings, book_id), book_id)
+        if len(postings) > 2 * _BLOCK_LOAD:
+            return SortedIds(postings)
+        return postings
+    postings.add(book_id)
+    return postings
+
+
+def _posting_removed(postings, book_id):
+    # The postings left after removing book_id, or None once empty.
+    if type(postings) is int:
+        return None
+    if type(postings) is array:
+        del postings[bisect_left(postings, book_id)]
+        return postings[0] if len(postings) == 1 else postings
+    postings.remove(book_id)
+    return postings if postings else None
+
+
+def _posting_ids(postings):
+    return (postings,) if type(postings) is int else postings
+
+
+_AVAILABLE = ('available',)
+
+
+class BookLender:
+    def __init__(self, cache_size=0):
+        self.book_root = None
+        self.patron_root = None
+        self._author_index = {}
+        # Title search: normalized titles sorted for prefix queries, and
+        # token -> sorted book_ids for keyword queries.  None until the
+        # first title search builds them (see _title_indexes).
+        self._title_index = None
+        self._title_tokens = None
+        # book_id -> PatronNode currently holding the book
+        self._borrowers = {}
+        # times_borrowed -> SortedIds of book_ids, plus the sorted list of the
+        # counts that have at least one book, for popularity queries.
+        self._borrow_buckets = {}
+        self._borrow_levels = []
+        self._log = None
+        self._stats = None
+        # Replaced with real locks by booklender.threadsafe.ConcurrentBookLender:
+        # _patron_lock guards the patron tree, _aggregate_lock the counters
+        # shared between books (subtree availability, borrow counts).
+        self._patron_lock = nullcontext()
+        self._aggregate_lock = nullcontext()
+        # Optional LRU cache in front of check_book and the listings.
+        self._cache = ResultCache(cache_size) if cache_size else None
+ 
+    def _add_book_rec(self, book_id, title, author, isbn):
+        path = []
+        node = self.book_root
+        while node is not None:
+            if book_id < node.book_id:
+                path.append((node, False))
+                node = node.left
+            elif book_id > node.book_id:
+                path.append((node, True))
+                node = node.right
+            else:
+                self._overwrite_book(node, title, author, isbn)
+                return node
+        for parent, _ in path:
+            parent.size += 1
+            parent.available_count += 1
+        node = BookNode(book_id, title, author, isbn)
+        self.book_root = _attach(path, node)
+        self._index_author(author, book_id)
+        self._index_title(title, book_id)
+        if self._cache is not None:
+            self._cache.invalidate(('book', book_id), ('author', _author_key(author)), _AVAILABLE)
+        return node
+ 
+    def _overwrite_book(self, node, title, author, isbn):
+        if _author_key(node.author) != _author_key(author):
+            self._unindex_author(node.author, node.book_id)
+            self._index_author(author, node.book_id)
+        if _title_key(node.title) != _title_key(title):
+            self._unindex_title(node.title, node.book_id)
+            self._index_title(title, node.book_id)
+        if self._cache is not None:
+            self._cache.invalidate(('book', node.book_id), ('author', _author_key(node.author)),
+                                   ('author', _author_key(author)), _AVAILABLE)
+        node.title = title
+        node.author = sys.intern(author)
+        node.isbn = isbn
+ 
+    def _index_author(self, author, book_id):
+        book_ids = self._author_index.setdefault(_author_key(author), [])
+        if book_ids and book_ids[-1] < book_id:
+            book_ids.append(book_id)
+        else:
+            insort(book_ids, book_id)
+ 
+    def _unindex_author(self, author, book_id):
+        key = _author_key(author)
+        book_ids = self._author_index[key]
+        del book_ids[bisect_left(book_ids, book_id)]
+        if not book_ids:
+            del self._author_index[key]
+ 
+    def _title_indexes(self):
+        # Built from the tree on the first title search and maintained by
+        # add_book from then on, so libraries that never search titles (and
+        # snapshot loads) do not pay for tokenizing every title.
+        if self._title_index is None:
+            self._title_index = TitleIndex()
+            self._title_tokens = {}
+            self._index_titles(list(self.iter_books()))
+        return self._title_index, self._title_tokens
+ 
+    def _index_title(self, title, book_id):
+        if self._title_index is None:
+            return
+        key = _title_key(title)
+        self._title_index.add(key, book_id)
+        tokens = self._title_tokens
+        for token in _title_tokens(key):
+            tokens[token] = _posting_added(tokens.get(token), book_id)
+ 
+    def _unindex_title(self, title, book_id):
+        if self._title_index is None:
+            return
+        key = _title_key(title)
+        self._title_index.remove(key, book_id)
+        tokens = self._title_tokens
+        for token in _title_tokens(key):
+            postings = _posting_removed(tokens[token], book_id)
+            if postings is None:
+                del tokens[token]
+            else:
+                tokens[token] = postings
+ 
+    def _index_titles(self, nodes):
+        # Batch form of _index_title for nodes in book_id order: the prefix
+        # index is merged and re-blocked once instead of added to per node.
+        if self._title_index is None:
+            return
+        self._title_index.extend([(_title_key(node.title), node.book_id) for node in nodes])
+        tokens = self._title_tokens
+        for node in nodes:
+            for token in _title_tokens(_title_key(node.title)):
+                tokens[token] = _posting_added(tokens.get(token), node.book_id)
+ 
+    def iter_books_by_title_prefix(self, prefix):
+        # Books whose normalized title starts with prefix, in title order.
+        title_index, _ = self._title_indexes()
+        for book_id in title_index.iter_prefix(_title_key(prefix)):
+            yield self._search_book(self.book_root, book_id)
+ 
+    def iter_books_by_title_keywords(self, query):
+        # Books whose title contains every word of query, in book_id order.
+        tokens = _title_tokens(_title_key(query))
+        if not tokens:
+            return
+        _, title_tokens = self._title_indexes()
+        postings = sorted((_posting_ids(title_tokens.get(token, ())) for token in tokens), key=len)
+        matches = set(postings[0])
+        for other in postings[1:]:
+            matches.intersection_update(other)
+        for book_id in sorted(matches):
+            yield self._search_book(self.book_root, book_id)
+ 
+    def search_title(self, query):
+        books = [_book_line(node) for node in self.iter_books_by_title_keywords(query)]
+        if books:
+            return f'Books matching title "{query}":\n' + "\n".join(books)
+        return f'No books found matching title "{query}".'
+ 
+    def search_title_prefix(self, prefix):
+        books = [_book_line(node) for node in self.iter_books_by_title_prefix(prefix)]
+        if books:
+            return f'Books with title starting "{prefix}":\n' + "\n".join(books)
+        return f'No books found with title starting "{prefix}".'
+ 
+    def add_book(self, book_id, title, author, isbn):
+        self._add_book_rec(book_id, title, author, isbn)
+        if self._log is not None:
+            self._log.append('addBook', book_id, title, author, isbn)
+        return f'Added Book: {book_id} - "{title}" by {author}, ISBN: {isbn}'
+ 
+    def bulk_load_books(self, books):
+        # books is an iterable of (book_id, title, author, isbn); the batch is
+        # merged with the existing catalog and the tree rebuilt in one pass.
+        records = _sorted_by_key(books)
+        existing = list(self.iter_books())
+        nodes = []
+        added = []
+        i = 0
+        for index, (book_id, title, author, isbn) in enumerate(records):
+            if index + 1 < len(records) and records[index + 1][0] == book_id:
+                continue
+            if self._log is not None:
+                self._log.append('addBook', book_id, title, author, isbn)
+            while i < len(existing) and existing[i].book_id < book_id:
+                nodes.append(existing[i])
+                i += 1
+            if i < len(existing) and existing[i].book_id == book_id:
+                self._overwrite_book(existing[i], title, author, isbn)
+                nodes.append(existing[i])
+                i += 1
+            else:
+                node = BookNode(book_id, title, author, isbn)
+                nodes.append(node)
+                added.append(node)
+                self._index_author(author, book_id)
+        nodes.extend(existing[i:])
+        self.book_root = _build_balanced(nodes)
+        self._index_titles(added)
+        if self._cache is not None:
+            self._cache.clear()
+ 
+    def bulk_load_patrons(self, patrons):
+        # patrons is an iterable of (patron_id, name); existing patrons are kept.
+        records = _sorted_by_key(patrons)
+        existing = list(self.iter_patrons())
+        nodes = []
+        i = 0
+        for index, (patron_id, name) in enumerate(records):
+            if index and records[index - 1][0] == patron_id:
+                continue
+            while i < len(existing) and existing[i].patron_id < patron_id:
+                nodes.append(existing[i])
+                i += 1
+            if i < len(existing) and existing[i].patron_id == patron_id:
+                continue
+            if self._log is not None:
+                self._log.append('addPatron', patron_id, name)
+            nodes.append(PatronNode(patron_id, name))
+        nodes.extend(existing[i:])
+        self.patron_root = _build_balanced(nodes)
+ 
+    def attach_log(self, log):
+        # Mutations are appended to log (see booklender.wal.OperationLog) once
+        # they have been applied; pass None to stop logging.
+        self._log = log
+ 
+    def enable_stats(self, dump_every=None, dump_stream=None):
+        from .stats import LibraryStats, instrument
+        stats = LibraryStats(dump_every, dump_stream)
+        instrument(self, stats)
+        return stats
+ 
+    def disable_stats(self):
+        from .stats import uninstrument
+        uninstrument(self)
+ 
+    def stats(self):
+        return self._stats.as_dict() if self._stats is not None else None
+ 
+    def export_columns(self):
+        from .analytics import export_columns
+        return export_columns(self)
+ 
+    def save_snapshot(self, path):
+        from .snapshot import save_snapshot
+        save_snapshot(self, path)
+ 
+    @classmethod
+    def load_snapshot(cls, path):
+        from .snapshot import load_snapshot
+        return load_snapshot(path, cls)
+ 
+    def _search_book(self, node, book_id):
+        while node is not None and node.book_id != book_id:
+            node = node.left if book_id < node.book_id else node.right
+        return node
+ 
+    def _book_path(self, book_id):
+        path = []
+        node = self.book_root
+        while node is not None:
+            path.append(node)
+            if book_id == node.book_id:
+                return path
+            node = node.left if book_id < node.book_id else node.right
+        return None
+ 
+    def iter_books(self, lo=None, hi=None, available_only=False):
+        stack = []
+        node = self.book_root
+        while stack or node is not None:
+            if node is not None:
+                if available_only and not node.available_count:
+                    node = None
+                elif lo is not None and node.book_id < lo:
+                    node = node.right
+                else:
+                    stack.append(node)
+                    node = node.left
+            else:
+                node = stack.pop()
+                if hi is not None and node.book_id > hi:
+                    return
+                if node.available or not available_only:
+                    yield node
+                node = node.right
+ 
+    def iter_patrons(self):
+        stack = []
+        node = self.patron_root
+        while stack or node is not None:
+            if node is not None:
+                stack.append(node)
+                node = node.left
+            else:
+                node = stack.pop()
+                yield node
+                node = node.right
+ 
+    def cache_info(self):
+        return self._cache.info() if self._cache is not None else None
+ 
+    def list_available_books(self):
+        if self._cache is not None:
+            return self._cache.fetch(_AVAILABLE, _AVAILABLE, self._list_available_books)
+        return self._list_available_books()
+ 
+    def _list_available_books(self):
+        available_books = [_book_line(node) for node in self.iter_books(available_only=True)]
+        return "Available Books:\n" + "\n".join(available_books)
+ 
+    def iter_available_books_lines(self):
+        # The lines of list_available_books(), produced lazily.
+        yield "Available Books:"
+        empty = True
+        for node in self.iter_books(available_only=True):
+            empty = False
+            yield _book_line(node)
+        if empty:
+            yield ""
+ 
+    def write_available_books(self, sink, chunk_size=1024):
+        # Writes list_available_books() + "\n" to sink without building the
+        # whole listing in memory.
+        self._write_listing(_AVAILABLE, _AVAILABLE, self.iter_available_books_lines(), sink, chunk_size)
+
+    def _write_listing(self, key, tag, lines, sink, chunk_size):
+        # A cached copy is written as is.  On a miss, a listing of at most
+        # chunk_size lines is held whole for its single write anyway, so it
+        # is also cached; longer listings are streamed and never cached.
+        cache = self._cache
+        if cache is None:
+            _write_lines(lines, sink, chunk_size)
+            return
+        generation = cache.generation
+        cached = cache.lookup(key)
+        if cached is not None:
+            sink.write(cached + "\n")
+            return
+        head = list(islice(lines, chunk_size + 1))
+        if len(head) > chunk_size:
+            _write_lines(chain(head, lines), sink, chunk_size)
+            return
+        result = "\n".join(head)
+        cache.store(key, tag, result, generation)
+        sink.write(result + "\n")
+ 
+    def available_count(self):
+        return self.book_root.available_count if self.book_root is not None else 0
+ 
+    def book_count(self):
+        return self.book_root.size if self.book_root is not None else 0
+ 
+    def rank(self, book_id):
+        # Number of books with a smaller book_id.
+        rank = 0
+        node = self.book_root
+        while node is not None:
+            if book_id <= node.book_id:
+                node = node.left
+            else:
+                rank += 1 + (node.left.size if node.left is not None else 0)
+                node = node.right
+        return rank
+ 
+    def select(self, k):
+        # The book at 0-based position k in book_id order, or None.
+        node = self.book_root
+        while node is not None:
+            left = node.left.size if node.left is not None else 0
+            if k < left:
+                node = node.left
+            elif k == left:
+                return node
+            else:
+                k -= left + 1
+                node = node.right
+        return None
+ 
+    def select_available(self, k):
+        # The k-th (0-based) available book in book_id order, or None.
+        node = self.book_root
+        while node is not None:
+            left = node.left.available_count if node.left is not None else 0
+            if k < left:
+                node = node.left
+            elif k == left and node.available:
+                return node
+            else:
+                k -= left + node.available
+                node = node.right
+        return None
+ 
+    def books_in_range(self, lo, hi):
+        return list(self.iter_books(lo, hi))
+ 
+    def count_books_in_range(self, lo, hi):
+        return self.rank(hi + 1) - self.rank(lo) if lo <= hi else 0
+ 
+    def page_books(self, size, after=None, available_only=False):
+        # Returns up to size books following book_id after (from the start if
+        # None) and the cursor for the next page, None on the last page.
+        if size <= 0:
+            raise ValueError(f'page size must be positive, got {size}')
+        books = list(islice(self.iter_books(None if after is None else after + 1,
+                                            available_only=available_only), size + 1))
+        if len(books) > size:
+            del books[size:]
+            return books, books[-1].book_id
+        return books, None
+ 
+    def list_books_in_range(self, lo, hi):
+        books = [_book_line(node) for node in self.iter_books(lo, hi)]
+        if books:
+            return f'Books in Range {lo}-{hi}:\n' + "\n".join(books)
+        return f'No books found in range {lo}-{hi}.'
+ 
+    def list_books_page(self, size, after=None):
+        if size <= 0:
+            return f'Invalid page size {size}.'
+        books, cursor = self.page_books(size, after)
+        if not books:
+            return 'No more books.'
+        next_page = f'Next Page After: {cursor}' if cursor is not None else 'Last Page'
+        return 'Books Page:\n' + "\n".join(_book_line(node) for node in books) + '\n' + next_page
+ 
+    def rank_book(self, book_id):
+        if self._search_book(self.book_root, book_id) is None:
+            return f'Book ID {book_id} is not in the catalog.'
+        return f'Book ID {book_id} is at position {self.rank(book_id) + 1} of {self.book_count()}.'
+ 
+    def select_book(self, position):
+        node = self.select(position - 1) if position > 0 else None
+        if node is None:
+            return f'No book at position {position}.'
+        return f'Book at Position {position}:\n{_book_line(node)}'
+ 
+    def select_available_book(self, position):
+        node = self.select_available(position - 1) if position > 0 else None
+        if node is None:
+            return f'No available book at position {position}.'
+        return f'Available Book at Position {position}:\n{_book_line(node)}'
+ 
+    def iter_books_by_author(self, author_name):
+        for book_id in self._author_index.get(_author_key(author_name), ()):
+            yield self._search_book(self.book_root, book_id)
+ 
+    def list_books_by_author(self, author_name):
+        if self._cache is not None:
+            return self._cache.fetch(('author', author_name), ('author', _author_key(author_name)),
+                                     self._list_books_by_author, author_name)
+        return self._list_books_by_author(author_name)
+ 
+    def _list_books_by_author(self, author_name):
+        books_by_author = [_book_line(node) for node in self.iter_books_by_author(author_name)]
+        if books_by_author:
+            return f'Books by Author "{author_name}":\n' + "\n".join(books_by_author)
+        else:
+            return f'No books found by Author "{author_name}".'
+ 
+    def iter_books_by_author_lines(self, author_name):
+        # The lines of list_books_by_author(), produced lazily.
+        books = self.iter_books_by_author(author_name)
+        first = next(books, None)
+        if first is None:
+            yield f'No books found by Author "{author_name}".'
+            return
+        yield f'Books by Author "{author_name}":'
+        yield _book_line(first)
+        for node in books:
+            yield _book_line(node)
+ 
+    def write_books_by_author(self, author_name, sink, chunk_size=1024):
+        self._write_listing(('author', author_name), ('author', _author_key(author_name)),
+                            self.iter_books_by_author_lines(author_name), sink, chunk_size)
+ 
+    def borrow_book(self, book_id, patron_id):
+        path = self._book_path(book_id)
+        if path is None or not path[-1].available:
+            return f'Book ID {book_id} is not available for borrowing.'
+        book = path[-1]
+        with self._patron_lock:
+            patron = self.search_patron(self.patron_root, patron_id)
+            if patron is None:
+                patron = self._add_pateron(patron_id, f'Patron {patron_id}')
+                if self._log is not None:
+                    self._log.append('addPatron', patron_id, patron.name)
+        with self._aggregate_lock:
+            # Clear the flag before the counts so a concurrent listing never
+            # prunes a subtree that still holds an available book.
+            book.available = False
+            for node in path:
+                node.available_count -= 1
+            book.times_borrowed += 1
+            self._count_borrow(book)
+        patron.borrowed_books[book_id] = book
+        self._borrowers[book_id] = patron
+        if self._cache is not None:
+            self._cache.invalidate(('book', book_id), _AVAILABLE)
+        if self._log is not None:
+            self._log.append('borrowBook', book_id, patron_id)
+        return f'Patron {patron_id} borrowed "{book.title}" (Book ID: {book_id})'
+ 
+    def _count_borrow(self, book):
+        previous = book.times_borrowed - 1
+        if previous:
+            bucket = self._borrow_buckets[previous]
+            bucket.remove(book.book_id)
+            if not bucket:
+                del self._borrow_buckets[previous]
+                del self._borrow_levels[bisect_left(self._borrow_levels, previous)]
+        self._bucket_book(book)
+ 
+    def _bucket_book(self, book):
+        bucket = self._borrow_buckets.get(book.times_borrowed)
+        if bucket is None:
+            bucket = self._borrow_buckets[book.times_borrowed] = SortedIds()
+            insort(self._borrow_levels, book.times_borrowed)
+        bucket.add(book.book_id)
+ 
+    def iter_most_borrowed(self, limit=None, min_count=1):
+        # Most borrowed first, ties in book_id order; with min_count <= 0 the
+        # books never borrowed follow, since they are borrowed at least 0 times.
+        if limit is not None and limit < 0:
+            raise ValueError(f'limit must not be negative, got {limit}')
+        for count in reversed(self._borrow_levels):
+            if count < min_count or limit == 0:
+                return
+            # Buckets are kept in book_id order, so a limited query reads
+            # only the first limit ids instead of scanning a tied bucket.
+            book_ids = list(islice(self._borrow_buckets[count], limit))
+            if limit is not None:
+                limit -= len(book_ids)
+            for book_id in book_ids:
+                yield self._search_book(self.book_root, book_id)
+        if min_count <= 0 and limit != 0:
+            never_borrowed = (node for node in self.iter_books() if not node.times_borrowed)
+            yield from islice(never_borrowed, limit)
+ 
+    def list_most_borrowed_books(self, limit):
+        if limit <= 0:
+            return f'Invalid limit {limit}.'
+        books = [_popular_line(node) for node in self.iter_most_borrowed(limit)]
+        if books:
+            return f'Top {limit} Most Borrowed Books:\n' + "\n".join(books)
+        return 'No books have been borrowed.'
+ 
+    def list_books_borrowed_at_least(self, min_count):
+        books = [_popular_line(node) for node in self.iter_most_borrowed(min_count=min_count)]
+        if books:
+            return f'Books Borrowed At Least {min_count} Times:\n' + "\n".join(books)
+        return f'No books have been borrowed at least {min_count} times.'
+ 
+    def current_borrower(self, book_id):
+        patron = self._borrowers.get(book_id)
+        return patron.patron_id if patron is not None else None
+ 
+    def check_book(self, book_id):
+        if self._cache is not None:
+            key = ('book', book_id)
+            return self._cache.fetch(key, key, self._check_book, book_id)
+        return self._check_book(book_id)
+ 
+    def _check_book(self, book_id):
+        book = self._search_book(self.book_root, book_id)
+        if book is None:
+            return f'Book Details for ID {book_id}'
+        if book.available:
+            return f'Book Details for ID {book_id} :\n - {book.title} by {book.author}, ISBN: {book.isbn}, Available: Yes'
+        return f'Book Details for ID {book_id} : \n- {book.title} by {book.author}, ISBN: {book.isbn}, Available: No'
+    
+    def _add_pateron(self, patron_id, name):
+        path = []
+        node = self.patron_root
+        while node is not None:
+            if patron_id < node.patron_id:
+                path.append((node, False))
+                node = node.left
+            elif patron_id > node.patron_id:
+                path.append((node, True))
+                node = node.right
+            else:
+                return node
+        node = PatronNode(patron_id, name)
+        self.patron_root = _attach(path, node)
+        return node
+ 
+    def search_patron(self, node, patron_id):
+        while node is not None and node.patron_id != patron_id:
+            node = node.left if patron_id < node.patron_id else node.right
+        return node
+ 
+    def return_book(self, book_id, patron_id):
+        path = self._book_path(book_id)
+        if path is None or path[-1].available:
+            return f'Book ID {book_id} is not currently borrowed.'
+        book = path[-1]
+        patron = self._borrowers.get(book_id)
+        if patron is None or patron.patron_id != patron_id:
+            return f'Patron {patron_id} did not borrow Book ID {book_id}.'
+        with self._aggregate_lock:
+            for node in path:
+                node.available_count += 1
+            book.available = True
+        del patron.borrowed_books[book_id]
+        del self._borrowers[book_id]
+        if self._cache is not None:
+            self._cache.invalidate(('book', book_id), _AVAILABLE)
+        if self._log is not None:
+            self._log.append('returnBook', book_id, patron_id)
+        return f'Patron {patron_id} returned "{book.title}" (Book ID: {book_id})'
+ 
+    def list_patrons_books(self, patron_id):
+        with self._patron_lock:
+            patron = self.search_patron(self.patron_root, patron_id)
+        if patron is None or not patron.borrowed_books:
+            return f'Patron {patron_id} has not borrowed any books.'
+        borrowed_books = [_loan_line(book) for book in patron.borrowed_books.values()]
+        return f'Patron {patron_id} borrowed the following books:\n' + "\n".join(borrowed_books)
+
+
+
+def _add_book_command(library, args):
+    book_id, title, author, isbn = map(str.strip, args.split(","))
+    return library.add_book(int(book_id), title.strip('"'), author.strip('"'), isbn.strip('"'))
+
+
+def _borrow_book_command(library, args):
+    book_id, patron_id = map(int, args.split(","))
+    return library.borrow_book(book_id, patron_id)
+
+
+def _return_book_command(library, args):
+    book_id, patron_id = map(int, args.split(","))
+    return library.return_book(book_id, patron_id)
+
+
+def _check_book_command(library, args):
+    return library.check_book(int(args))
+
+
+def _list_available_books_command(library, args):
+    return library.list_available_books()
+
+
+def _list_books_by_author_command(library, args):
+    return library.list_books_by_author(args.strip('"'))
+
+
+def _list_patrons_books_command(library, args):
+    return library.list_patrons_books(int(args))
+
+
+def _list_most_borrowed_books_command(library, args):
+    return library.list_most_borrowed_books(int(args))
+
+
+def _list_books_borrowed_at_least_command(library, args):
+    return library.list_books_borrowed_at_least(int(args))
+
+
+def _list_books_in_range_command(library, args):
+    lo, hi = map(int, args.split(","))
+    return library.list_books_in_range(lo, hi)
+
+
+def _list_books_page_command(library, args):
+    # listBooksPage: size[, after_book_id]
+    size, _, after = args.partition(",")
+    return library.list_books_page(int(size), int(after) if after.strip() else None)
+
+
+def _rank_book_command(library, args):
+    return library.rank_book(int(args))
+
+
+def _select_book_command(library, args):
+    return library.select_book(int(args))
+
+
+def _select_available_book_command(library, args):
+    return library.select_available_book(int(args))
+
+
+def _search_title_command(library, args):
+    return library.search_title(args.strip().strip('"'))
+
+
+def _search_title_prefix_command(library, args):
+    return library.search_title_prefix(args.strip().strip('"'))
+
+
+COMMANDS = {
+    'addBook': _add_book_command,
+    'borrowBook': _borrow_book_command,
+    'returnBook': _return_book_command,
+    'checkBook': _check_book_command,
+    'listAvailableBooks': _list_available_books_command,
+    'listBooksByAuthor': _list_books_by_author_command,
+    'listPatronsBooks': _list_patrons_books_command,
+    'listMostBorrowedBooks': _list_most_borrowed_books_command,
+    'listBooksBorrowedAtLeast': _list_books_borrowed_at_least_command,
+    'listBooksInRange': _list_books_in_range_command,
+    'listBooksPage': _list_books_page_command,
+    'rankBook': _rank_book_command,
+    'selectBook': _select_book_command,
+    'selectAvailableBook': _select_available_book_command,
+    'searchTitle': _search_title_command,
+    'searchTitlePrefix': _search_title_prefix_command,
+}
+
+
+def _write_available_books_command(library, args, out_stream, chunk_size):
+    library.write_available_books(out_stream, chunk_size)
+
+
+def _write_books_by_author_command(library, args, out_stream, chunk_size):
+    library.write_books_by_author(args.strip('"'), out_stream, chunk_size)
+
+
+# Listings that process_commands streams straight to the output instead of
+# formatting the whole result first.
+STREAMING_COMMANDS = {
+    'listAvailableBooks': _write_available_books_command,
+    'listBooksByAuthor': _write_books_by_author_command,
+}
+
+
+def execute_command(library, line):
+    # Runs a single protocol line; returns None for blank or unknown commands.
+    keyword, _, args = line.strip().partition(":")
+    handler = COMMANDS.get(keyword)
+    if handler is None:
+        return None
+    if library._stats is not None:
+        return library._stats.run(keyword, handler, library, args)
+    return handler(library, args)
+
+
+def process_commands(in_stream, out_stream, library=None, batch_size=1024):
+    # in_stream may be any iterable of command lines (a file, sys.stdin, a
+    # list); results are written to out_stream in batches of batch_size, and
+    # the STREAMING_COMMANDS listings are written as they are produced.
+    if library is None:
+        library = BookLender()
+    commands = COMMANDS
+    streaming = STREAMING_COMMANDS
+    stats = library._stats
+    results = []
+    for line in in_stream:
+        keyword, _, args = line.strip().partition(":")
+        handler = commands.get(keyword)
+        if handler is None:
+            continue
+        writer = streaming.get(keyword)
+        if writer is not None:
+            if results:
+                results.append("")
+                out_stream.write("\n".join(results))
+                results.clear()
+            if stats is None:
+                writer(library, args, out_stream, batch_size)
+            else:
+                stats.run(keyword, lambda library, args: writer(library, args, out_stream, batch_size),
+                          library, args)
+        elif stats is None:
+            results.append(handler(library, args))
+        else:
+            results.append(stats.run(keyword, handler, library, args))
+        if len(results) >= batch_size:
+            results.append("")
+            out_stream.write("\n".join(results))
+            results.clear()
+    if results:
+        results.append("")
+        out_stream.write("\n".join(results))
+    return library
+
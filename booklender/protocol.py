@@ -0,0 +1,28 @@
+# Wire format shared by booklender.server and the thin client in
+# booklender.client; kept free of imports so the client starts without
+# loading the library itself.
+#
+# One command per line in the same syntax as inputPS04.txt.  Every
+# non-blank command gets exactly one response, terminated by a line holding
+# a single "."; response lines that start with "." are prefixed with
+# another "." (SMTP-style dot-stuffing).  Clients may pipeline.
+TERMINATOR = '.'
+
+# The keywords booklender.core.COMMANDS handles.  The server answers any
+# other line with "Unknown command: ..."; process_commands skips such
+# lines, so the thin client does not send them.
+KEYWORDS = frozenset((
+    'addBook', 'borrowBook', 'returnBook', 'checkBook', 'listAvailableBooks', 'listBooksByAuthor',
+    'listPatronsBooks', 'listMostBorrowedBooks', 'listBooksBorrowedAtLeast', 'listBooksInRange',
+    'listBooksPage', 'rankBook', 'selectBook', 'selectAvailableBook', 'searchTitle', 'searchTitlePrefix',
+))
+
+
+def frame(result):
+    lines = result.split('\n')
+    for i, line in enumerate(lines):
+        if line.startswith('.'):
+            lines[i] = '.' + line
+    lines.append(TERMINATOR)
+    lines.append('')
+    return '\n'.join(lines)
@@ -0,0 +1,135 @@
+import asyncio
+
+from .core import BookLender, execute_command
+from .protocol import TERMINATOR, frame
+
+
+class LibraryServer:
+    def __init__(self, library=None, host='127.0.0.1', port=0, read_size=65536, max_line=1 << 20):
+        self.library = library if library is not None else BookLender()
+        self.host = host
+        self.port = port
+        self.read_size = read_size
+        self.max_line = max_line
+        self._server = None
+        self._connections = set()
+
+    def respond(self, line):
+        line = line.strip()
+        if not line:
+            return None
+        try:
+            result = execute_command(self.library, line)
+        except ValueError:
+            result = f'Invalid command: {line}'
+        except Exception as exc:
+            # A failing handler costs only its own response; the connection
+            # and the rest of a pipelined read still get answered.
+            result = f'Command failed: {line} ({type(exc).__name__}: {exc})'
+        if result is None:
+            result = f'Unknown command: {line}'
+        return frame(result)
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        for task in self._connections:
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        # Every complete line in a read is answered before replying with one
+        # write; awaiting drain() stops reading from a client that does not
+        # consume its responses, so TCP flow control pushes back on it.
+        task = asyncio.current_task()
+        self._connections.add(task)
+        pending = b''
+        try:
+            while True:
+                chunk = await reader.read(self.read_size)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b'\n')
+                pending = lines.pop()
+                if len(pending) > self.max_line:
+                    break
+                responses = []
+                for line in lines:
+                    response = self.respond(line.decode('utf-8', 'replace'))
+                    if response is not None:
+                        responses.append(response)
+                if responses:
+                    writer.write(''.join(responses).encode('utf-8'))
+                    await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+
+class LibraryClient:
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    async def connect(cls, host='127.0.0.1', port=8765):
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _read_response(self):
+        lines = []
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                raise ConnectionError('server closed the connection')
+            line = line.decode('utf-8').rstrip('\n')
+            if line == TERMINATOR:
+                return '\n'.join(lines)
+            if line.startswith('.'):
+                line = line[1:]
+            lines.append(line)
+
+    async def _send(self, commands, chunk_size):
+        for start in range(0, len(commands), chunk_size):
+            chunk = commands[start:start + chunk_size]
+            self._writer.write(''.join(command + '\n' for command in chunk).encode('utf-8'))
+            await self._writer.drain()
+
+    async def pipeline(self, commands, chunk_size=1024):
+        # Commands are written from a separate task while responses are read
+        # here: the server stops reading from a client that is not draining
+        # its responses, so writing everything first deadlocks on a pipeline
+        # larger than the socket buffers.
+        commands = [command.strip() for command in commands if command.strip()]
+        async with self._lock:
+            sender = asyncio.ensure_future(self._send(commands, chunk_size))
+            try:
+                responses = [await self._read_response() for _ in commands]
+            except BaseException:
+                sender.cancel()
+                await asyncio.gather(sender, return_exceptions=True)
+                raise
+            await sender
+            return responses
+
+    async def request(self, command):
+        return (await self.pipeline([command]))[0]
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
@@ -0,0 +1,238 @@
+import heapq
+import multiprocessing
+from bisect import bisect_right
+from itertools import islice
+
+from .core import COMMANDS, BookLender, _book_line, _loan_line, _popular_line, _title_key
+
+# Commands that read every shard; the rest are routed by book_id.
+SCATTER = frozenset(('list_available_books', 'list_books_by_author', 'list_patrons_books',
+                     'list_most_borrowed_books', 'list_books_borrowed_at_least', 'list_books_in_range',
+                     'search_title', 'search_title_prefix'))
+# Position queries need global order statistics across shards.
+UNSUPPORTED = frozenset(('list_books_page', 'rank_book', 'select_book', 'select_available_book'))
+
+
+class _Recorder:
+    # Stands in for a BookLender so the COMMANDS parsers can be reused: each
+    # call returns the (method, args) operation instead of running it.
+    def __getattr__(self, name):
+        return lambda *args: (name, args)
+
+
+_RECORDER = _Recorder()
+
+
+def even_boundaries(lo, hi, shards):
+    # Split points that divide book_ids in [lo, hi) into equal ranges.
+    step = (hi - lo) / shards
+    return [lo + int(step * i) for i in range(1, shards)]
+
+
+def _run(library, loan_seq, op, args):
+    if op == 'borrow_book':
+        book_id, patron_id, seq = args
+        book = library._search_book(library.book_root, book_id)
+        lendable = book is not None and book.available
+        result = library.borrow_book(book_id, patron_id)
+        if lendable:
+            loan_seq[book_id] = seq
+        return result
+    if op == 'list_available_books':
+        return [_book_line(node) for node in library.iter_books(available_only=True)]
+    if op == 'list_books_in_range':
+        return [_book_line(node) for node in library.iter_books(*args)]
+    if op == 'search_title':
+        return [_book_line(node) for node in library.iter_books_by_title_keywords(*args)]
+    if op == 'search_title_prefix':
+        return [(_title_key(node.title), node.book_id, _book_line(node))
+                for node in library.iter_books_by_title_prefix(*args)]
+    if op == 'list_books_by_author':
+        return [_book_line(node) for node in library.iter_books_by_author(*args)]
+    if op == 'list_most_borrowed_books':
+        if args[0] <= 0:
+            return []
+        return [(-node.times_borrowed, node.book_id, _popular_line(node)) for node in library.iter_most_borrowed(*args)]
+    if op == 'list_books_borrowed_at_least':
+        return [(-node.times_borrowed, node.book_id, _popular_line(node))
+                for node in library.iter_most_borrowed(min_count=args[0])]
+    if op == 'list_patrons_books':
+        patron = library.search_patron(library.patron_root, args[0])
+        if patron is None:
+            return []
+        return [(loan_seq[book_id], _loan_line(book)) for book_id, book in patron.borrowed_books.items()]
+    return getattr(library, op)(*args)
+
+
+def _shard_main(conn):
+    library = BookLender()
+    loan_seq = {}
+    while True:
+        batch = conn.recv()
+        if batch is None:
+            break
+        conn.send([_run(library, loan_seq, op, args) for op, args in batch])
+    conn.close()
+
+
+class ShardedBookLender:
+    # Runs one BookLender per book_id range in its own process.  A patron's
+    # loan of a book is recorded on the shard that owns the book, stamped
+    # with a coordinator-wide sequence number so list_patrons_books can merge
+    # the shards' loans back into borrowing order.
+    def __init__(self, boundaries, context=None):
+        ctx = multiprocessing.get_context(context)
+        self.boundaries = sorted(boundaries)
+        self._loan_seq = 0
+        self._pipes = []
+        self._processes = []
+        for _ in range(len(self.boundaries) + 1):
+            parent, child = ctx.Pipe()
+            process = ctx.Process(target=_shard_main, args=(child,), daemon=True)
+            process.start()
+            child.close()
+            self._pipes.append(parent)
+            self._processes.append(process)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        for pipe in self._pipes:
+            pipe.send(None)
+            pipe.close()
+        for process in self._processes:
+            process.join()
+        self._pipes = []
+
+    def shard_for(self, book_id):
+        return bisect_right(self.boundaries, book_id)
+
+    def execute(self, operations):
+        # operations is a list of (method, args) pairs; each shard gets its
+        # share of the batch in one message and they all run in parallel.
+        batches = [[] for _ in self._pipes]
+        plan = []
+        for op, args in operations:
+            if op in UNSUPPORTED:
+                raise ValueError(f'{op} is not supported by ShardedBookLender')
+            if op in SCATTER:
+                plan.append((op, args, [len(batch) for batch in batches]))
+                for batch in batches:
+                    batch.append((op, args))
+                continue
+            if op == 'borrow_book':
+                self._loan_seq += 1
+                args = args + (self._loan_seq,)
+            shard = self.shard_for(args[0])
+            plan.append((op, shard, len(batches[shard])))
+            batches[shard].append((op, args))
+        for pipe, batch in zip(self._pipes, batches):
+            pipe.send(batch)
+        replies = [pipe.recv() for pipe in self._pipes]
+        results = []
+        for op, target, position in plan:
+            if op in SCATTER:
+                results.append(_gather(op, target, [reply[i] for reply, i in zip(replies, position)]))
+            else:
+                results.append(replies[target][position])
+        return results
+
+    def add_book(self, book_id, title, author, isbn):
+        return self.execute([('add_book', (book_id, title, author, isbn))])[0]
+
+    def borrow_book(self, book_id, patron_id):
+        return self.execute([('borrow_book', (book_id, patron_id))])[0]
+
+    def return_book(self, book_id, patron_id):
+        return self.execute([('return_book', (book_id, patron_id))])[0]
+
+    def check_book(self, book_id):
+        return self.execute([('check_book', (book_id,))])[0]
+
+    def list_available_books(self):
+        return self.execute([('list_available_books', ())])[0]
+
+    def list_books_by_author(self, author_name):
+        return self.execute([('list_books_by_author', (author_name,))])[0]
+
+    def list_patrons_books(self, patron_id):
+        return self.execute([('list_patrons_books', (patron_id,))])[0]
+
+    def list_most_borrowed_books(self, limit):
+        return self.execute([('list_most_borrowed_books', (limit,))])[0]
+
+    def list_books_borrowed_at_least(self, min_count):
+        return self.execute([('list_books_borrowed_at_least', (min_count,))])[0]
+
+    def process_commands(self, in_stream, out_stream, batch_size=4096):
+        operations = []
+        for line in in_stream:
+            keyword, _, args = line.strip().partition(":")
+            handler = COMMANDS.get(keyword)
+            if handler is None:
+                continue
+            operations.append(handler(_RECORDER, args))
+            if len(operations) >= batch_size:
+                self._write(self.execute(operations), out_stream)
+                operations = []
+        if operations:
+            self._write(self.execute(operations), out_stream)
+
+    @staticmethod
+    def _write(results, out_stream):
+        results.append("")
+        out_stream.write("\n".join(results))
+
+
+def _gather(op, args, parts):
+    # Shards own ascending book_id ranges, so concatenating their in-order
+    # listings in shard order is the k-way merge.
+    if op == 'list_available_books':
+        return "Available Books:\n" + "\n".join(line for part in parts for line in part)
+    if op == 'list_books_by_author':
+        author_name = args[0]
+        lines = [line for part in parts for line in part]
+        if lines:
+            return f'Books by Author "{author_name}":\n' + "\n".join(lines)
+        return f'No books found by Author "{author_name}".'
+    if op == 'list_books_in_range':
+        lo, hi = args
+        lines = [line for part in parts for line in part]
+        if lines:
+            return f'Books in Range {lo}-{hi}:\n' + "\n".join(lines)
+        return f'No books found in range {lo}-{hi}.'
+    if op == 'search_title':
+        query = args[0]
+        lines = [line for part in parts for line in part]
+        if lines:
+            return f'Books matching title "{query}":\n' + "\n".join(lines)
+        return f'No books found matching title "{query}".'
+    if op == 'search_title_prefix':
+        prefix = args[0]
+        lines = [line for _, _, line in heapq.merge(*parts)]
+        if lines:
+            return f'Books with title starting "{prefix}":\n' + "\n".join(lines)
+        return f'No books found with title starting "{prefix}".'
+    if op == 'list_most_borrowed_books':
+        limit = args[0]
+        if limit <= 0:
+            return f'Invalid limit {limit}.'
+        lines = [line for _, _, line in islice(heapq.merge(*parts), limit)]
+        if lines:
+            return f'Top {limit} Most Borrowed Books:\n' + "\n".join(lines)
+        return 'No books have been borrowed.'
+    if op == 'list_books_borrowed_at_least':
+        min_count = args[0]
+        lines = [line for _, _, line in heapq.merge(*parts)]
+        if lines:
+            return f'Books Borrowed At Least {min_count} Times:\n' + "\n".join(lines)
+        return f'No books have been borrowed at least {min_count} times.'
+    patron_id = args[0]
+    loans = sorted(loan for part in parts for loan in part)
+    if not loans:
+        return f'Patron {patron_id} has not borrowed any books.'
+    return f'Patron {patron_id} borrowed the following books:\n' + "\n".join(line for _, line in loans)
@@ -0,0 +1,161 @@
+import cProfile
+import json
+import sys
+from contextlib import contextmanager
+from time import perf_counter
+
+
+class CommandStats:
+    __slots__ = ('count', 'total', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        # buckets[i] counts calls that took less than 2**i microseconds.
+        self.buckets = [0] * 40
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total += elapsed
+        self.buckets[min(int(elapsed * 1e6).bit_length(), 39)] += 1
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total_seconds': self.total,
+            'mean_us': self.total / self.count * 1e6 if self.count else 0.0,
+            'histogram_us': {f'<{1 << i}': n for i, n in enumerate(self.buckets) if n},
+        }
+
+
+class LibraryStats:
+    # Collects per-command latency (fed by process_commands/execute_command)
+    # and search depth (fed by the counting search functions that
+    # instrument() installs on a BookLender).
+    def __init__(self, dump_every=None, dump_stream=None):
+        self.commands = {}
+        self.book_searches = 0
+        self.book_visits = 0
+        self.patron_searches = 0
+        self.patron_visits = 0
+        self.dump_every = dump_every
+        self.dump_stream = dump_stream if dump_stream is not None else sys.stderr
+        self.library = None
+        self._hooks = {}
+        self._recorded = 0
+
+    def add_hook(self, command, hook):
+        # hook is a zero-argument callable returning a context manager that is
+        # entered around every run of that command keyword.
+        self._hooks[command] = hook
+
+    def remove_hook(self, command):
+        self._hooks.pop(command, None)
+
+    def run(self, command, handler, library, args):
+        hook = self._hooks.get(command)
+        start = perf_counter()
+        if hook is None:
+            result = handler(library, args)
+        else:
+            with hook():
+                result = handler(library, args)
+        self.record(command, perf_counter() - start)
+        return result
+
+    def record(self, command, elapsed):
+        stats = self.commands.get(command)
+        if stats is None:
+            stats = self.commands[command] = CommandStats()
+        stats.add(elapsed)
+        self._recorded += 1
+        if self.dump_every and self._recorded % self.dump_every == 0:
+            self.dump()
+
+    def dump(self):
+        self.dump_stream.write(json.dumps(self.as_dict()) + '\n')
+        self.dump_stream.flush()
+
+    def as_dict(self):
+        library = self.library
+        return {
+            'commands': {name: stats.as_dict() for name, stats in self.commands.items()},
+            'book_tree_height': library.book_root.height if library and library.book_root else 0,
+            'patron_tree_height': library.patron_root.height if library and library.patron_root else 0,
+            'book_searches': self.book_searches,
+            'book_node_visits': self.book_visits,
+            'average_book_search_depth': self.book_visits / self.book_searches if self.book_searches else 0.0,
+            'patron_searches': self.patron_searches,
+            'patron_node_visits': self.patron_visits,
+            'average_patron_search_depth':
+                self.patron_visits / self.patron_searches if self.patron_searches else 0.0,
+        }
+
+
+class CommandProfiler:
+    # Hook that profiles only the commands it is attached to:
+    #     stats.add_hook('borrowBook', CommandProfiler())
+    def __init__(self, profiler=None):
+        self.profiler = profiler if profiler is not None else cProfile.Profile()
+
+    @contextmanager
+    def __call__(self):
+        self.profiler.enable()
+        try:
+            yield
+        finally:
+            self.profiler.disable()
+
+    def print_stats(self, sort='cumulative'):
+        self.profiler.print_stats(sort)
+
+
+def instrument(library, stats):
+    # Shadow the library's search methods with counting versions; removing
+    # the instance attributes (uninstrument) restores the plain ones.
+    stats.library = library
+
+    def _search_book(node, book_id):
+        visits = 0
+        while node is not None:
+            visits += 1
+            if node.book_id == book_id:
+                break
+            node = node.left if book_id < node.book_id else node.right
+        stats.book_searches += 1
+        stats.book_visits += visits
+        return node
+
+    def _book_path(book_id):
+        path = []
+        node = library.book_root
+        while node is not None:
+            path.append(node)
+            if book_id == node.book_id:
+                break
+            node = node.left if book_id < node.book_id else node.right
+        stats.book_searches += 1
+        stats.book_visits += len(path)
+        return path if node is not None else None
+
+    def search_patron(node, patron_id):
+        visits = 0
+        while node is not None:
+            visits += 1
+            if node.patron_id == patron_id:
+                break
+            node = node.left if patron_id < node.patron_id else node.right
+        stats.patron_searches += 1
+        stats.patron_visits += visits
+        return node
+
+    library._search_book = _search_book
+    library._book_path = _book_path
+    library.search_patron = search_patron
+    library._stats = stats
+
+
+def uninstrument(library):
+    for name in ('_search_book', '_book_path', 'search_patron'):
+        library.__dict__.pop(name, None)
+    library._stats = None
@@ -0,0 +1,207 @@
+import threading
+from contextlib import contextmanager
+
+from .core import BookLender
+
+
+class ReadWriteLock:
+    # Many readers or one writer; waiting writers block new readers so a
+    # steady stream of reads cannot starve add_book.
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._waiting_writers = 0
+
+    def acquire_read(self):
+        with self._cond:
+            while self._writer or self._waiting_writers:
+                self._cond.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._cond:
+            self._readers -= 1
+            if not self._readers:
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        with self._cond:
+            self._waiting_writers += 1
+            while self._writer or self._readers:
+                self._cond.wait()
+            self._waiting_writers -= 1
+            self._writer = True
+
+    def release_write(self):
+        with self._cond:
+            self._writer = False
+            self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class ConcurrentBookLender:
+    # Thread-safe front for a BookLender.  The book tree's shape only changes
+    # under the exclusive side of tree_lock (add_book, bulk loads); borrows,
+    # returns and reads share it.  Check-then-act on a book is serialized by
+    # a per-stripe lock keyed on book_id, and a patron's loan list by a
+    # stripe keyed on patron_id (always taken after the book stripe).
+    def __init__(self, library=None, stripes=64):
+        self.library = library if library is not None else BookLender()
+        self.library._patron_lock = threading.Lock()
+        self.library._aggregate_lock = threading.Lock()
+        if self.library._cache is not None:
+            self.library._cache._lock = threading.Lock()
+        self.tree_lock = ReadWriteLock()
+        self._book_stripes = [threading.Lock() for _ in range(stripes)]
+        self._patron_stripes = [threading.Lock() for _ in range(stripes)]
+
+    def _book_stripe(self, book_id):
+        return self._book_stripes[hash(book_id) % len(self._book_stripes)]
+
+    def _patron_stripe(self, patron_id):
+        return self._patron_stripes[hash(patron_id) % len(self._patron_stripes)]
+
+    def add_book(self, book_id, title, author, isbn):
+        with self.tree_lock.write_locked():
+            return self.library.add_book(book_id, title, author, isbn)
+
+    def bulk_load_books(self, books):
+        with self.tree_lock.write_locked():
+            self.library.bulk_load_books(books)
+
+    def bulk_load_patrons(self, patrons):
+        with self.tree_lock.write_locked():
+            self.library.bulk_load_patrons(patrons)
+
+    def borrow_book(self, book_id, patron_id):
+        with self.tree_lock.read_locked(), self._book_stripe(book_id), self._patron_stripe(patron_id):
+            return self.library.borrow_book(book_id, patron_id)
+
+    def return_book(self, book_id, patron_id):
+        with self.tree_lock.read_locked(), self._book_stripe(book_id), self._patron_stripe(patron_id):
+            return self.library.return_book(book_id, patron_id)
+
+    def check_book(self, book_id):
+        with self.tree_lock.read_locked():
+            return self.library.check_book(book_id)
+
+    def list_available_books(self):
+        with self.tree_lock.read_locked():
+            return self.library.list_available_books()
+
+    def cache_info(self):
+        return self.library.cache_info()
+
+    def available_count(self):
+        return self.library.available_count()
+
+    def list_books_by_author(self, author_name):
+        with self.tree_lock.read_locked():
+            return self.library.list_books_by_author(author_name)
+
+    def list_patrons_books(self, patron_id):
+        with self.tree_lock.read_locked(), self._patron_stripe(patron_id):
+            return self.library.list_patrons_books(patron_id)
+
+    def write_available_books(self, sink, chunk_size=1024):
+        with self.tree_lock.read_locked():
+            self.library.write_available_books(sink, chunk_size)
+
+    def write_books_by_author(self, author_name, sink, chunk_size=1024):
+        with self.tree_lock.read_locked():
+            self.library.write_books_by_author(author_name, sink, chunk_size)
+
+    def rank(self, book_id):
+        with self.tree_lock.read_locked():
+            return self.library.rank(book_id)
+
+    def select(self, k):
+        with self.tree_lock.read_locked():
+            return self.library.select(k)
+
+    def count_books_in_range(self, lo, hi):
+        with self.tree_lock.read_locked():
+            return self.library.count_books_in_range(lo, hi)
+
+    def books_in_range(self, lo, hi):
+        with self.tree_lock.read_locked():
+            return self.library.books_in_range(lo, hi)
+
+    def page_books(self, size, after=None, available_only=False):
+        with self.tree_lock.read_locked():
+            return self.library.page_books(size, after, available_only)
+
+    def list_books_in_range(self, lo, hi):
+        with self.tree_lock.read_locked():
+            return self.library.list_books_in_range(lo, hi)
+
+    def list_books_page(self, size, after=None):
+        with self.tree_lock.read_locked():
+            return self.library.list_books_page(size, after)
+
+    def rank_book(self, book_id):
+        with self.tree_lock.read_locked():
+            return self.library.rank_book(book_id)
+
+    def select_book(self, position):
+        with self.tree_lock.read_locked():
+            return self.library.select_book(position)
+
+    # The subtree availability counts and the popularity buckets change
+    # under _aggregate_lock in borrow_book/return_book, so queries that
+    # walk them take it too.
+    def select_available(self, k):
+        with self.tree_lock.read_locked(), self.library._aggregate_lock:
+            return self.library.select_available(k)
+
+    def select_available_book(self, position):
+        with self.tree_lock.read_locked(), self.library._aggregate_lock:
+            return self.library.select_available_book(position)
+
+    def list_most_borrowed_books(self, limit):
+        with self.tree_lock.read_locked(), self.library._aggregate_lock:
+            return self.library.list_most_borrowed_books(limit)
+
+    def list_books_borrowed_at_least(self, min_count):
+        with self.tree_lock.read_locked(), self.library._aggregate_lock:
+            return self.library.list_books_borrowed_at_least(min_count)
+
+    def _title_indexes(self):
+        # The first title search builds the indexes, which is a write.
+        if self.library._title_index is None:
+            with self.tree_lock.write_locked():
+                self.library._title_indexes()
+
+    def search_title(self, query):
+        self._title_indexes()
+        with self.tree_lock.read_locked():
+            return self.library.search_title(query)
+
+    def search_title_prefix(self, prefix):
+        self._title_indexes()
+        with self.tree_lock.read_locked():
+            return self.library.search_title_prefix(prefix)
+
+    def save_snapshot(self, path):
+        with self.tree_lock.write_locked():
+            self.library.save_snapshot(path)
+
+    def checkpoint(self, background=True):
+        with self.tree_lock.write_locked():
+            return self.library._log.checkpoint(self.library, background)
@@ -0,0 +1,180 @@
+import json
+import os
+import threading
+
+from .core import BookLender
+from .snapshot import dump_snapshot, load_snapshot, snapshot_log_seq, write_snapshot
+
+SNAPSHOT_NAME = 'snapshot.bin'
+SEGMENT_PREFIX = 'wal.'
+
+
+def _segments(directory):
+    numbers = []
+    for name in os.listdir(directory):
+        if name.startswith(SEGMENT_PREFIX) and name[len(SEGMENT_PREFIX):].isdigit():
+            numbers.append(int(name[len(SEGMENT_PREFIX):]))
+    return sorted(numbers)
+
+
+def _segment_path(directory, number):
+    return os.path.join(directory, f'{SEGMENT_PREFIX}{number:08d}')
+
+
+class OperationLog:
+    # Append-only log of BookLender mutations, one JSON array per line:
+    # [seq, op, *args].  A background thread fsyncs once group_size records
+    # are pending or flush_interval seconds have passed (group commit), so
+    # appends never wait on the disk; callers that need durability call
+    # wait_durable(seq) or sync().
+    def __init__(self, directory, seq=0, group_size=256, flush_interval=0.005):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.group_size = group_size
+        self.flush_interval = flush_interval
+        self.seq = seq
+        self.durable_seq = seq
+        segments = _segments(directory)
+        self._segment = (segments[-1] + 1) if segments else 0
+        self._file = open(_segment_path(directory, self._segment), 'a', encoding='utf-8')
+        self._cond = threading.Condition()
+        self._sync_lock = threading.Lock()
+        self._checkpointer = None
+        self._closed = False
+        self._flusher = threading.Thread(target=self._run_flusher, name='wal-flusher', daemon=True)
+        self._flusher.start()
+
+    def append(self, op, *args):
+        with self._cond:
+            if self._closed:
+                raise ValueError('operation log is closed')
+            self.seq += 1
+            self._file.write(json.dumps((self.seq, op) + args) + '\n')
+            if self.seq - self.durable_seq >= self.group_size:
+                self._cond.notify_all()
+            return self.seq
+
+    def _run_flusher(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._closed or self.seq - self.durable_seq >= self.group_size,
+                                    self.flush_interval)
+                if self.seq == self.durable_seq:
+                    if self._closed:
+                        return
+                    continue
+                target = self.seq
+                log_file = self._file
+                log_file.flush()
+            self._fsync(log_file, target)
+
+    def _fsync(self, log_file, target):
+        with self._sync_lock:
+            if not log_file.closed:
+                os.fsync(log_file.fileno())
+        with self._cond:
+            if target > self.durable_seq:
+                self.durable_seq = target
+            self._cond.notify_all()
+
+    def wait_durable(self, seq):
+        with self._cond:
+            self._cond.wait_for(lambda: self.durable_seq >= seq)
+
+    def sync(self):
+        with self._cond:
+            target = self.seq
+            log_file = self._file
+            log_file.flush()
+        self._fsync(log_file, target)
+
+    def _rotate(self):
+        # Caller holds self._cond; everything up to self.seq becomes durable.
+        self._file.flush()
+        with self._sync_lock:
+            os.fsync(self._file.fileno())
+            self._file.close()
+        self.durable_seq = self.seq
+        self._cond.notify_all()
+        self._segment += 1
+        self._file = open(_segment_path(self.directory, self._segment), 'a', encoding='utf-8')
+
+    def checkpoint(self, library, background=True):
+        # The snapshot image is taken synchronously so it matches self.seq;
+        # writing it out and deleting the covered segments happens on a
+        # background thread unless background is False.
+        if self._checkpointer is not None:
+            self._checkpointer.join()
+        with self._cond:
+            data = dump_snapshot(library, self.seq)
+            self._rotate()
+            first_live = self._segment
+        worker = threading.Thread(target=self._finish_checkpoint, args=(data, first_live),
+                                  name='wal-checkpoint', daemon=True)
+        worker.start()
+        self._checkpointer = worker
+        if not background:
+            worker.join()
+        return worker
+
+    def _finish_checkpoint(self, data, first_live):
+        write_snapshot(os.path.join(self.directory, SNAPSHOT_NAME), data)
+        for number in _segments(self.directory):
+            if number < first_live:
+                os.remove(_segment_path(self.directory, number))
+
+    def close(self):
+        if self._checkpointer is not None:
+            self._checkpointer.join()
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+        with self._cond:
+            self._file.flush()
+            with self._sync_lock:
+                os.fsync(self._file.fileno())
+                self._file.close()
+            self.durable_seq = self.seq
+
+
+def _replay(library, op, args):
+    if op == 'addBook':
+        library.add_book(*args)
+    elif op == 'borrowBook':
+        library.borrow_book(*args)
+    elif op == 'returnBook':
+        library.return_book(*args)
+    elif op == 'addPatron':
+        library._add_pateron(*args)
+    else:
+        raise ValueError(f'unknown operation in log: {op!r}')
+
+
+def recover(directory, cls=BookLender, **log_options):
+    # Load the latest snapshot, replay the log records it does not cover and
+    # return the library with a fresh OperationLog attached.
+    os.makedirs(directory, exist_ok=True)
+    snapshot_path = os.path.join(directory, SNAPSHOT_NAME)
+    if os.path.exists(snapshot_path):
+        library = load_snapshot(snapshot_path, cls)
+        seq = snapshot_log_seq(snapshot_path)
+    else:
+        library = cls()
+        seq = 0
+    for number in _segments(directory):
+        with open(_segment_path(directory, number), encoding='utf-8') as segment:
+            for line in segment:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # A torn final record from a crash mid-append.
+                    break
+                if record[0] <= seq:
+                    continue
+                _replay(library, record[1], record[2:])
+                seq = record[0]
+    library.attach_log(OperationLog(directory, seq=seq, **log_options))
+    return library
@@ -0,0 +1,73 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from booklender import analytics
+from booklender.core import BookLender
+
+
+@pytest.fixture
+def library():
+    library = BookLender()
+    library.add_book(1, 'Alpha', 'Ann', '111')
+    library.add_book(2, 'Beta', 'ann ', '222')
+    library.add_book(3, 'Gamma', 'Bob', '333')
+    library.add_book(4, 'Delta', 'Cy', '444')
+    library.borrow_book(1, 10)
+    library.return_book(1, 10)
+    library.borrow_book(1, 10)
+    library.borrow_book(3, 11)
+    library.borrow_book(2, 10)
+    return library
+
+
+def test_export_columns(library):
+    columns = analytics.export_columns(library)
+    assert columns['book_id'].tolist() == [1, 2, 3, 4]
+    assert columns['available'].tolist() == [False, False, False, True]
+    assert columns['times_borrowed'].tolist() == [2, 1, 1, 0]
+    # Authors are grouped by normalized name, like list_books_by_author.
+    assert columns['authors'].tolist() == ['ann', 'bob', 'cy']
+    assert columns['author_code'].tolist() == [0, 0, 1, 2]
+    assert columns['patron_id'].tolist() == [10, 11]
+    assert columns['patron_loans'].tolist() == [2, 1]
+    assert library.export_columns()['book_id'].tolist() == [1, 2, 3, 4]
+
+
+def test_export_empty_library():
+    columns = analytics.export_columns(BookLender())
+    assert columns['book_id'].size == 0
+    assert analytics.availability_ratio(columns) == 0.0
+    assert analytics.top_authors(columns) == []
+    assert analytics.borrow_percentiles(columns) == {50: 0.0, 90: 0.0, 99: 0.0}
+
+
+def test_save_and_load_round_trip(library, tmp_path):
+    columns = analytics.export_columns(library)
+    path = tmp_path / 'columns.npz'
+    analytics.save_columns(columns, path)
+    loaded = analytics.load_columns(path)
+    assert sorted(loaded) == sorted(columns)
+    for name, column in columns.items():
+        assert loaded[name].tolist() == column.tolist()
+    assert loaded['authors'].dtype == object
+
+
+def test_per_author_aggregates(library):
+    columns = analytics.export_columns(library)
+    assert analytics.books_per_author(columns).tolist() == [2, 1, 1]
+    assert analytics.borrows_per_author(columns).tolist() == [3, 1, 0]
+    assert analytics.available_per_author(columns).tolist() == [0, 0, 1]
+    assert analytics.top_authors(columns, n=2) == [('ann', 3), ('bob', 1)]
+    assert analytics.top_authors(columns, n=1, by='books') == [('ann', 2)]
+    assert analytics.top_authors(columns, n=10) == [('ann', 3), ('bob', 1), ('cy', 0)]
+
+
+def test_distribution_summaries(library):
+    columns = analytics.export_columns(library)
+    assert analytics.availability_ratio(columns) == 0.25
+    counts, edges = analytics.borrow_histogram(columns, bins=2)
+    assert counts.tolist() == [1, 3]
+    assert edges.tolist() == [0.0, 1.0, 2.0]
+    assert analytics.borrow_percentiles(columns, (0, 50, 100)) == {0: 0.0, 50: 1.0, 100: 2.0}
+    assert analytics.loan_percentiles(columns, (0, 100)) == {0: 1.0, 100: 2.0}
@@ -0,0 +1,75 @@
+import math
+
+import pytest
+
+from booklender.core import BookLender
+
+SEQUENTIAL_BOOKS = 1_000_000
+SEQUENTIAL_PATRONS = 100_000
+
+
+def avl_height_bound(count):
+    # Maximum height of an AVL tree holding count nodes.
+    return int(1.4405 * math.log2(count + 2) - 0.3277)
+
+
+def check_avl(root):
+    # Iterative post-order walk: every node's height is 1 + the taller
+    # child's, children differ by at most one level; returns the node count.
+    count = 0
+    stack = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if node is None:
+            continue
+        if not visited:
+            stack.append((node, True))
+            stack.append((node.left, False))
+            stack.append((node.right, False))
+            continue
+        left = node.left.height if node.left is not None else 0
+        right = node.right.height if node.right is not None else 0
+        assert abs(left - right) <= 1
+        assert node.height == 1 + max(left, right)
+        count += 1
+    return count
+
+
+@pytest.fixture(scope='module')
+def sequential_library():
+    library = BookLender()
+    for book_id in range(SEQUENTIAL_BOOKS):
+        library.add_book(book_id, f'Title {book_id}', f'Author {book_id % 100}', f'{book_id}')
+    return library
+
+
+def test_sequential_books_load_without_recursion_error(sequential_library):
+    assert sequential_library.book_count() == SEQUENTIAL_BOOKS
+    assert sequential_library.book_root.height <= avl_height_bound(SEQUENTIAL_BOOKS)
+    assert check_avl(sequential_library.book_root) == SEQUENTIAL_BOOKS
+
+
+def test_sequential_books_stay_searchable(sequential_library):
+    last = SEQUENTIAL_BOOKS - 1
+    assert sequential_library.check_book(last).startswith(f'Book Details for ID {last} :')
+    assert sequential_library.borrow_book(last, 1).startswith('Patron 1 borrowed')
+    assert sequential_library.return_book(last, 1).startswith('Patron 1 returned')
+    assert sequential_library.available_count() == SEQUENTIAL_BOOKS
+
+
+def test_sequential_patrons_stay_balanced():
+    library = BookLender()
+    for book_id in range(SEQUENTIAL_PATRONS):
+        library.add_book(book_id, f'Title {book_id}', 'Author', f'{book_id}')
+        library.borrow_book(book_id, book_id)
+    assert library.patron_root.height <= avl_height_bound(SEQUENTIAL_PATRONS)
+    assert check_avl(library.patron_root) == SEQUENTIAL_PATRONS
+    assert '(Book ID: 0)' in library.list_patrons_books(0)
+
+
+def test_descending_books_stay_balanced():
+    library = BookLender()
+    for book_id in range(10_000, 0, -1):
+        library.add_book(book_id, f'Title {book_id}', 'Author', f'{book_id}')
+    assert library.book_root.height <= avl_height_bound(10_000)
+    assert check_avl(library.book_root) == 10_000
@@ -0,0 +1,86 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+from booklender import cli
+from booklender.core import COMMANDS
+from booklender.protocol import KEYWORDS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUT = os.path.join(ROOT, 'inputPS04.txt')
+EXPECTED = os.path.join(ROOT, 'tests', 'data', 'outputPS04.expected.txt')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def server():
+    # A separate `booklender serve` process per test, so every remote run
+    # starts from an empty library as a local run does.
+    port = free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.Popen([sys.executable, '-m', 'booklender', 'serve', '--port', str(port)], cwd=ROOT, env=env)
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', port), timeout=1).close()
+                break
+            except OSError:
+                if process.poll() is not None or time.monotonic() > deadline:
+                    raise
+                time.sleep(0.05)
+        yield f'127.0.0.1:{port}'
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def run_local(input_path, tmp_path):
+    output = str(tmp_path / 'local.txt')
+    assert cli.main([input_path, output]) == 0
+    with open(output) as outfile:
+        return outfile.read()
+
+
+def run_remote(input_path, tmp_path, address):
+    output = str(tmp_path / 'remote.txt')
+    assert cli.main(['--connect', address, input_path, output]) == 0
+    with open(output) as outfile:
+        return outfile.read()
+
+
+def test_local_run_matches_baseline(tmp_path):
+    with open(EXPECTED) as expected:
+        assert run_local(INPUT, tmp_path) == expected.read()
+
+
+def test_connect_matches_local_run(tmp_path, server):
+    assert run_remote(INPUT, tmp_path, server) == run_local(INPUT, tmp_path)
+
+
+def test_connect_skips_unknown_and_blank_lines(tmp_path, server):
+    input_path = str(tmp_path / 'input.txt')
+    with open(input_path, 'w') as infile:
+        infile.write('addBook: 1, Dune, Herbert, 111\n\n   \nfrobnicate: 1\nlistAvailableBooks\n'
+                     'noSuchCommand\ncheckBook: 1\n.\nborrowBook: 1, 7\n')
+    assert run_remote(input_path, tmp_path, server) == run_local(input_path, tmp_path)
+
+
+@pytest.mark.parametrize('argv', [['--connect'], ['--connect', 'abc'], ['--connect', 'localhost:'],
+                                  ['--connect', 'localhost:http'], ['--connect', '70000']])
+def test_bad_connect_address_prints_usage(argv, capsys):
+    assert cli.main(argv) == 2
+    assert capsys.readouterr().err == cli.USAGE
+
+
+def test_protocol_keywords_match_commands():
+    assert KEYWORDS == set(COMMANDS)
@@ -0,0 +1,123 @@
+import random
+import sys
+import threading
+
+import pytest
+
+from booklender.threadsafe import ConcurrentBookLender
+
+THREADS = 4
+OPERATIONS = 3000
+BOOKS = 300
+PATRONS = 40
+
+
+@pytest.fixture(autouse=True)
+def fast_switching():
+    # Switch threads far more often than the default 5 ms so the few
+    # thousand operations actually interleave.
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def worker(library, seed, borrowed, errors):
+    rng = random.Random(seed)
+    count = 0
+    try:
+        for _ in range(OPERATIONS):
+            book_id = rng.randrange(BOOKS)
+            patron_id = rng.randrange(PATRONS)
+            choice = rng.random()
+            if choice < 0.4:
+                if library.borrow_book(book_id, patron_id).startswith('Patron'):
+                    count += 1
+            elif choice < 0.8:
+                library.return_book(book_id, patron_id)
+            elif choice < 0.9:
+                library.check_book(book_id)
+            else:
+                library.list_patrons_books(patron_id)
+    except Exception as exc:
+        errors.append(exc)
+    borrowed.append(count)
+
+
+def reader(library, seed, stop, errors):
+    rng = random.Random(seed)
+    try:
+        while not stop.is_set():
+            library.list_most_borrowed_books(5)
+            library.select_available_book(rng.randrange(1, BOOKS))
+            library.list_books_page(10, rng.randrange(BOOKS))
+            library.search_title_prefix(f'title {rng.randrange(BOOKS)}')
+    except Exception as exc:
+        errors.append(exc)
+
+
+def check_accounting(library, successful_borrows):
+    lender = library.library
+    books = list(lender.iter_books())
+    loans = [book_id for patron in lender.iter_patrons() for book_id in patron.borrowed_books]
+    assert len(loans) == len(set(loans)), 'a book is on loan to two patrons'
+    assert sorted(loans) == [node.book_id for node in books if not node.available]
+    assert sorted(loans) == sorted(lender._borrowers)
+    assert sum(node.times_borrowed for node in books) == successful_borrows
+    assert lender.available_count() == sum(1 for node in books if node.available)
+    popular = list(lender.iter_most_borrowed())
+    assert [node.book_id for node in popular] == \
+        [node.book_id for node in sorted(books, key=lambda node: (-node.times_borrowed, node.book_id))
+         if node.times_borrowed]
+
+
+def test_concurrent_borrows_keep_loan_accounting():
+    library = ConcurrentBookLender()
+    library.bulk_load_books((book_id, f'Title {book_id}', f'Author {book_id % 7}', str(book_id))
+                            for book_id in range(BOOKS))
+    borrowed = []
+    errors = []
+    stop = threading.Event()
+    workers = [threading.Thread(target=worker, args=(library, seed, borrowed, errors)) for seed in range(THREADS)]
+    readers = [threading.Thread(target=reader, args=(library, seed, stop, errors)) for seed in range(2)]
+    for thread in workers + readers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+    assert errors == []
+    assert len(borrowed) == THREADS
+    check_accounting(library, sum(borrowed))
+
+
+def test_concurrent_adds_and_borrows():
+    library = ConcurrentBookLender()
+    errors = []
+    borrowed = []
+
+    def adder(start):
+        try:
+            for book_id in range(start, BOOKS, 2):
+                library.add_book(book_id, f'Title {book_id}', 'Author', str(book_id))
+        except Exception as exc:
+            errors.append(exc)
+
+    def borrower(seed):
+        rng = random.Random(seed)
+        count = 0
+        for _ in range(OPERATIONS // 2):
+            if library.borrow_book(rng.randrange(BOOKS), rng.randrange(PATRONS)).startswith('Patron'):
+                count += 1
+        borrowed.append(count)
+
+    threads = [threading.Thread(target=adder, args=(start,)) for start in (0, 1)]
+    threads += [threading.Thread(target=borrower, args=(seed,)) for seed in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert library.library.book_count() == BOOKS
+    check_accounting(library, sum(borrowed))
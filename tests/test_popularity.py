@@ -0,0 +1,41 @@
+import io
+
+from booklender.core import BookLender, process_commands
+
+
+def make_library():
+    library = BookLender()
+    for book_id in range(1, 6):
+        library.add_book(book_id, f'Title {book_id}', 'Author', f'{book_id}')
+    for book_id, times in ((2, 3), (4, 1), (5, 3)):
+        for _ in range(times):
+            library.borrow_book(book_id, 7)
+            library.return_book(book_id, 7)
+    return library
+
+
+def test_most_borrowed_orders_by_count_then_book_id():
+    library = make_library()
+    assert [node.book_id for node in library.iter_most_borrowed()] == [2, 5, 4]
+    assert [node.book_id for node in library.iter_most_borrowed(2)] == [2, 5]
+    assert library.list_most_borrowed_books(1) == \
+        'Top 1 Most Borrowed Books:\n- Book ID 2: "Title 2" by Author (Borrowed 3 times)'
+
+
+def test_non_positive_limits_are_rejected():
+    library = make_library()
+    assert library.list_most_borrowed_books(0) == 'Invalid limit 0.'
+    assert library.list_most_borrowed_books(-1) == 'Invalid limit -1.'
+    out = io.StringIO()
+    process_commands(['listMostBorrowedBooks: -1', 'listMostBorrowedBooks: 0'], out, library)
+    assert out.getvalue() == 'Invalid limit -1.\nInvalid limit 0.\n'
+
+
+def test_borrowed_at_least_zero_includes_unborrowed_books():
+    library = make_library()
+    assert [node.book_id for node in library.iter_most_borrowed(min_count=0)] == [2, 5, 4, 1, 3]
+    assert [node.book_id for node in library.iter_most_borrowed(4, min_count=-3)] == [2, 5, 4, 1]
+    listing = library.list_books_borrowed_at_least(0).splitlines()
+    assert listing[0] == 'Books Borrowed At Least 0 Times:'
+    assert listing[-1] == '- Book ID 3: "Title 3" by Author (Borrowed 0 times)'
+    assert library.list_books_borrowed_at_least(4) == 'No books have been borrowed at least 4 times.'
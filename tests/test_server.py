@@ -0,0 +1,62 @@
+import asyncio
+import socket
+
+from booklender.core import BookLender
+from booklender.server import LibraryClient, LibraryServer
+
+# Far more than the (shrunk) socket buffers hold in either direction.
+LARGE_PIPELINE = 50_000
+SOCKET_BUFFER = 16 * 1024
+
+
+def shrink_buffers(sock):
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER)
+
+
+def run_with_server(library, client_main):
+    async def main():
+        server = await LibraryServer(library).start()
+        # Accepted sockets inherit the listening socket's buffer sizes.
+        shrink_buffers(server._server.sockets[0])
+        client = await LibraryClient.connect(port=server.port)
+        shrink_buffers(client._writer.get_extra_info('socket'))
+        try:
+            return await asyncio.wait_for(client_main(client), 60)
+        except asyncio.TimeoutError:
+            # A deadlocked pipeline leaves unsent data behind; drop it so
+            # the test fails instead of hanging in close().
+            client._writer.transport.abort()
+            raise
+        finally:
+            await client.close()
+            await server.close()
+    return asyncio.run(main())
+
+
+def test_pipeline_larger_than_socket_buffers():
+    library = BookLender()
+    commands = [f'addBook: {book_id}, "Title {book_id}", "Author {book_id % 10}", "{book_id}"'
+                for book_id in range(LARGE_PIPELINE)]
+    responses = run_with_server(library, lambda client: client.pipeline(commands))
+    assert len(responses) == LARGE_PIPELINE
+    assert responses[-1] == f'Added Book: {LARGE_PIPELINE - 1} - "Title {LARGE_PIPELINE - 1}" by Author 9, ' \
+                            f'ISBN: {LARGE_PIPELINE - 1}'
+    assert library.book_count() == LARGE_PIPELINE
+
+
+def test_responses_are_dot_stuffed_and_errors_framed():
+    library = BookLender()
+    library.add_book(1, '.hidden', 'Ann', '1')
+
+    def boom(book_id):
+        raise IndexError('boom')
+    library.check_book = boom
+
+    async def client_main(client):
+        return await client.pipeline(['searchTitlePrefix: .hid', 'checkBook: 1', 'nonsense', 'listBooksPage: 1'])
+    responses = run_with_server(library, client_main)
+    assert responses[0].splitlines()[1] == '- Book ID 1: ".hidden" by Ann'
+    assert responses[1] == 'Command failed: checkBook: 1 (IndexError: boom)'
+    assert responses[2] == 'Unknown command: nonsense'
+    assert responses[3].startswith('Books Page:')
@@ -0,0 +1,112 @@
+import os
+import random
+
+import pytest
+
+from booklender.wal import SNAPSHOT_NAME, _segments, recover
+
+
+def workload(library, operations, seed):
+    rng = random.Random(seed)
+    for _ in range(operations):
+        book_id = rng.randrange(200)
+        patron_id = rng.randrange(20)
+        choice = rng.random()
+        if choice < 0.3:
+            library.add_book(book_id, f'Title {rng.randrange(50)}', rng.choice(['Ann', 'Bob', ' ann']), f'{book_id}')
+        elif choice < 0.7:
+            library.borrow_book(book_id, patron_id)
+        else:
+            library.return_book(book_id, patron_id)
+
+
+def state(library):
+    books = [(node.book_id, node.title, node.author, node.isbn, node.available, node.times_borrowed)
+             for node in library.iter_books()]
+    patrons = [(patron.patron_id, patron.name, list(patron.borrowed_books)) for patron in library.iter_patrons()]
+    borrowers = sorted((book_id, patron.patron_id) for book_id, patron in library._borrowers.items())
+    listings = [library.list_available_books(), library.list_most_borrowed_books(10),
+                library.list_books_by_author('ann'), library.available_count()]
+    return books, patrons, borrowers, listings
+
+
+def crash(library):
+    # Everything appended so far reaches the disk, then the library is
+    # abandoned without closing its log, as a killed process would.
+    library._log.sync()
+
+
+@pytest.fixture
+def directory(tmp_path):
+    return str(tmp_path / 'wal')
+
+
+def test_recover_replays_log_without_checkpoint(directory):
+    library = recover(directory, flush_interval=0.001)
+    workload(library, 2000, seed=1)
+    crash(library)
+    assert not os.path.exists(os.path.join(directory, SNAPSHOT_NAME))
+    recovered = recover(directory)
+    assert state(recovered) == state(library)
+    recovered._log.close()
+
+
+def test_recover_from_snapshot_plus_log_tail(directory):
+    library = recover(directory, flush_interval=0.001)
+    workload(library, 1500, seed=2)
+    checkpointer = library._log.checkpoint(library, background=True)
+    workload(library, 1500, seed=3)
+    checkpointer.join()
+    crash(library)
+    # The checkpoint rotated to a new segment and deleted the ones its
+    # snapshot covers, so only the tail written since is left.
+    assert os.path.exists(os.path.join(directory, SNAPSHOT_NAME))
+    assert len(_segments(directory)) == 1
+    recovered = recover(directory)
+    assert state(recovered) == state(library)
+    recovered._log.close()
+
+
+def test_recover_after_repeated_restarts(directory):
+    library = recover(directory, flush_interval=0.001)
+    for seed in range(4):
+        workload(library, 500, seed=seed)
+        if seed % 2:
+            library._log.checkpoint(library, background=False)
+        crash(library)
+        expected = state(library)
+        library = recover(directory, flush_interval=0.001)
+        assert state(library) == expected
+    library._log.close()
+
+
+def test_recover_ignores_torn_final_record(directory):
+    library = recover(directory, flush_interval=0.001)
+    workload(library, 1000, seed=4)
+    crash(library)
+    expected = state(library)
+    last = os.path.join(directory, f'wal.{_segments(directory)[-1]:08d}')
+    with open(last, 'a', encoding='utf-8') as segment:
+        segment.write(f'[{library._log.seq + 1}, "addBook", 999, "Torn')
+    recovered = recover(directory, flush_interval=0.001)
+    assert state(recovered) == expected
+    # The recovered log continues after the last complete record.
+    assert recovered._log.seq == library._log.seq
+    recovered.add_book(500, 'After', 'Ann', '500')
+    crash(recovered)
+    again = recover(directory)
+    assert state(again) == state(recovered)
+    again._log.close()
+
+
+def test_recover_replays_bulk_loads(directory):
+    library = recover(directory, flush_interval=0.001)
+    library.bulk_load_books([(book_id, f'Bulk {book_id}', 'Bob', f'{book_id}') for book_id in range(300, 0, -3)])
+    library.bulk_load_patrons([(patron_id, f'Reader {patron_id}') for patron_id in range(10)])
+    workload(library, 500, seed=5)
+    library.bulk_load_books([(3, 'Replaced', 'Cy', '3'), (1000, 'New', 'Cy', '1000')])
+    crash(library)
+    recovered = recover(directory)
+    assert state(recovered) == state(library)
+    assert [patron.name for patron in recovered.iter_patrons()][:3] == ['Reader 0', 'Reader 1', 'Reader 2']
+    recovered._log.close()